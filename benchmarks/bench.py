@@ -0,0 +1,100 @@
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from benchmarks.generator import generate
+from benchmarks.server import CONTEST_PREFIX, serve
+from utils.profiler import peak_rss
+from utils.sources import source_class
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRESETS = {
+    'small': (50, 10, 5000),
+    'medium': (600, 13, 80000),
+    'large': (5000, 20, 1000000),
+}
+
+def source_config(source, base_url):
+    if source == 'domjudge':
+        return {
+            'url': base_url + CONTEST_PREFIX, 'username': 'bench', 'password': 'bench', 'xml': 'events',
+            'gold': 4, 'silver': 8, 'bronze': 12, 'no_occupy_award_categories': ['4'], 'award_best_girl': ['5'],
+        }
+    return {
+        'url': base_url + '/pta/', 'file': '', 'username': 'bench', 'password': 'bench', 'xml': 'events',
+        'ben': { 'group': [1], 'gold': 4, 'silver': 8, 'bronze': 12, 'first': 3, 'suffix': '' },
+        'zhuan': { 'group': [2], 'gold': 1, 'silver': 2, 'bronze': 3, 'first': 3, 'suffix': '(专科)' },
+    }
+
+def run_case(source, base_url, workdir):
+    phases = []
+    def timed(name, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            phases.append({ 'phase': name, 'wall': time.perf_counter() - start, 'peak_rss': peak_rss() })
+            return result
+        return wrapper
+    cls = source_class(source)
+    cls.load_data = timed('load', cls.load_data)
+    cls.prep_data = timed('prep', cls.prep_data)
+    os.chdir(workdir)
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        contest = cls(source_config(source, base_url))
+        timed('award', lambda: list(contest.resolver_award_formatter()))()
+        contest.award_list = contest.award_list[:1]
+        timed('export', contest.export)(os.path.join(workdir, 'events'))
+    return phases
+
+def spawn_case(source, base_url):
+    # 每个case在独立进程中运行，峰值内存互不影响
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+        res = subprocess.run([sys.executable, '-m', 'benchmarks.bench', '--case', source, base_url, workdir],
+                             cwd=workdir, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        if res.returncode != 0:
+            raise RuntimeError("%s case failed:\n%s" % (source, res.stderr))
+        return json.loads(res.stdout.strip().splitlines()[-1])
+
+def parse_scale(text):
+    if text in PRESETS:
+        return PRESETS[text]
+    teams, problems, submissions = map(int, text.split(':'))
+    return teams, problems, submissions
+
+def main():
+    parser = ArgumentParser(description='time load/prep/award/export on synthetic contests')
+    parser.add_argument('--scale', action='append', help='preset (%s) or teams:problems:submissions' % '/'.join(PRESETS))
+    parser.add_argument('--source', action='append', choices=['domjudge', 'pta'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--case', nargs=3, help='internal: run one case in this process')
+    argument = parser.parse_args()
+    if argument.case:
+        print (json.dumps(run_case(*argument.case)))
+        return
+    results = []
+    print ("%-9s %-22s %-7s %10s %12s" % ('source', 'scale', 'phase', 'wall(s)', 'peak RSS(MB)'))
+    for scale in argument.scale or ['small']:
+        teams, problems, submissions = parse_scale(scale)
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, teams, problems, submissions, argument.seed)
+            server = serve(directory)
+            base_url = 'http://127.0.0.1:%d' % server.server_address[1]
+            for source in argument.source or ['domjudge', 'pta']:
+                for phase in spawn_case(source, base_url):
+                    label = '%d:%d:%d' % (teams, problems, submissions)
+                    print ("%-9s %-22s %-7s %10.3f %12.1f" % (source, label, phase['phase'], phase['wall'], phase['peak_rss'] / 2 ** 20))
+                    results.append(dict(phase, source=source, teams=teams, problems=problems, submissions=submissions))
+            server.shutdown()
+    if argument.json:
+        with open(argument.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+import json
+import os
+import random
+import tempfile
+from argparse import ArgumentParser
+
+from benchmarks.generator import JUDGEMENT_TYPES
+from utils.XML import XML_dump, XML_segments
+from utils.delta import delta_write
+from utils.json_stream import iter_array
+from utils.ranking import Ranking
+from utils.records import Submission
+from utils.scoreboard import numpy, rank_rows, score_key, team_scores_numpy, team_scores_python
+
+def reference_ranked(order):
+    # 竞赛排名：分数相同名次相同，其后的名次顺延
+    result, last = [], None
+    for idx, (key, team_id) in enumerate(order):
+        if key != last:
+            rank, last = idx + 1, key
+        result.append((rank, team_id))
+    return result
+
+def check_ranking(rnd, rounds):
+    '''
+    随机插入、更新、删除队伍（分数大量相同，桶很小以触发拆分），
+    Ranking与按(分数, 第一次加入的顺序)排序的结果一致；rank_rows复用上一次的Ranking时与重新排序一致
+    '''
+    for _ in range(rounds):
+        ranking, keys, seq = Ranking(load=rnd.choice([1, 2, 4, 16])), {}, {}
+        for _ in range(rnd.randrange(1, 300)):
+            team_id = rnd.randrange(60)
+            if team_id in keys and rnd.random() < 0.2:
+                ranking.remove(team_id)
+                del keys[team_id]
+                continue
+            key = (-rnd.randrange(4), rnd.randrange(3), rnd.randrange(3))
+            seq.setdefault(team_id, len(seq))
+            assert ranking.update(team_id, key) == (keys.get(team_id) != key)
+            keys[team_id] = key
+        order = sorted(((key, team_id) for team_id, key in keys.items()), key=lambda item: (item[0], seq[item[1]]))
+        assert list(ranking) == [team_id for _, team_id in order]
+        assert list(ranking.ranked()) == reference_ranked(order)
+        assert len(ranking) == len(keys)
+
+    for _ in range(rounds):
+        ranking, seq = None, {}
+        for _ in range(rnd.randrange(1, 6)):
+            team_ids = rnd.sample(range(80), rnd.randrange(1, 80))
+            rows = [{ 'team_id': team_id, 'rank': 0, 'score': {
+                'num_solved': rnd.randrange(4), 'total_time': rnd.randrange(3), 'max_submission_id': rnd.randrange(3) } } for team_id in team_ids]
+            for team_id in team_ids:
+                seq.setdefault(team_id, len(seq))
+            expected = sorted(rows, key=lambda row: (score_key(row['score']), seq[row['team_id']]))
+            ranking = rank_rows(rows, ranking)
+            assert [row['team_id'] for row in rows] == [row['team_id'] for row in expected]
+            assert [(row['rank'], row['team_id']) for row in rows] == reference_ranked([(score_key(row['score']), row['team_id']) for row in expected])
+
+def random_value(rnd, depth=0):
+    kind = rnd.randrange(8 if depth < 3 else 6)
+    if kind == 0:
+        return rnd.randrange(-10 ** 6, 10 ** 6)
+    if kind == 1:
+        return rnd.uniform(-1e6, 1e6) * 10 ** rnd.randrange(-20, 20)
+    if kind == 2:
+        return rnd.choice([True, False, None])
+    if kind in (3, 4, 5):
+        return ''.join(rnd.choice('ab,]["\\ \n中é😀') for _ in range(rnd.randrange(6)))
+    if kind == 6:
+        return [random_value(rnd, depth + 1) for _ in range(rnd.randrange(4))]
+    return { random_value(rnd, 3): random_value(rnd, depth + 1) for _ in range(rnd.randrange(4)) }
+
+def split(data, rnd):
+    # 随机切成若干块，块边界可以落在多字节字符和数字中间
+    cuts = sorted(rnd.sample(range(1, len(data)), min(len(data) - 1, rnd.randrange(1, 12)))) if len(data) > 1 else []
+    return [data[start:end] for start, end in zip([0] + cuts, cuts + [len(data)])]
+
+def check_json_stream(rnd, rounds):
+    '''
+    随机JSON数组（随机空白和分块）的iter_array结果与json.loads一致；去掉或多加逗号后必须报错
+    '''
+    for _ in range(rounds):
+        items = [random_value(rnd) for _ in range(rnd.randrange(6))]
+        space = lambda: rnd.choice(['', ' ', '\n', ' \t\r\n'])
+        text = space() + '[' + space() + (space() + ',' + space()).join(json.dumps(item, ensure_ascii=rnd.random() < 0.5) for item in items) + space() + ']' + space()
+        data = text.encode('utf-8')
+        assert list(iter_array(split(data, rnd))) == json.loads(text)
+        if len(items) == 0:
+            continue
+        parts = [json.dumps(item) for item in items]
+        malformed = [
+            '[,' + ','.join(parts) + ']',
+            '[' + ','.join(parts) + ',]',
+            '[' + ','.join(parts[:1] + [''] + parts[1:]) + ']',
+        ]
+        if len(parts) > 1:
+            malformed.append('[' + ' '.join(parts) + ']')
+        for text in malformed:
+            try:
+                list(iter_array(split(text.encode('utf-8'), rnd)))
+            except ValueError:
+                continue
+            raise AssertionError("accepted malformed array %r" % text)
+
+def random_body(rnd):
+    text = lambda: ''.join(rnd.choice('ab<&>"\' 中') for _ in range(rnd.randrange(5)))
+    element = lambda: { 'id': rnd.randrange(100), 'name': text(), 'empty': {} } if rnd.random() < 0.8 else text()
+    return { 'contest': {
+        'info': { 'title': text(), 'length': '5:00:00' },
+        'team': [element() for _ in range(rnd.randrange(4))],
+        'run': (element() for _ in range(rnd.randrange(6))),
+        'finalized': { 'last-gold': rnd.randrange(3) },
+    } }
+
+def check_delta(rnd, rounds):
+    '''
+    XML_segments拼接后与XML_dump相同；对随机修改（改、插、删、截断、追加、外部改动文件）后的段，
+    delta_write写出的文件与直接拼接相同，只有内容没有变化且索引有效时返回False
+    '''
+    for _ in range(rounds):
+        seed, compact = rnd.random(), rnd.random() < 0.5
+        body = random_body(random.Random(seed))
+        assert ''.join(XML_segments(body, compact)) == XML_dump(random_body(random.Random(seed)), compact)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'events.xml')
+        for _ in range(rounds):
+            if os.path.exists(filename):
+                os.remove(filename)
+            segments, previous = [], None
+            for _ in range(rnd.randrange(1, 8)):
+                edit = rnd.randrange(6)
+                if edit == 0 or not segments:
+                    segments = segments + ['\n<run>%d</run>' % rnd.randrange(10 ** rnd.randrange(1, 4)) for _ in range(rnd.randrange(1, 50))]
+                elif edit == 1:
+                    segments = list(segments)
+                    segments[rnd.randrange(len(segments))] = '\n<run>中%d</run>' % rnd.randrange(100)
+                elif edit == 2:
+                    segments = segments[:rnd.randrange(len(segments))] + ['\n<award/>'] + segments[rnd.randrange(len(segments)):]
+                elif edit == 3:
+                    segments = segments[:rnd.randrange(len(segments) + 1)]
+                elif edit == 4 and previous is not None:
+                    # 其他程序改动了文件，索引失效
+                    with open(filename, 'a', encoding="utf-8") as f:
+                        f.write(' ')
+                    previous = None
+                text = '<contest>' + ''.join(segments) + '\n</contest>'
+                changed = delta_write(filename, ['<contest>'] + segments + ['\n</contest>'])
+                with open(filename, 'r', encoding="utf-8") as f:
+                    assert f.read() == text
+                assert changed == (text != previous)
+                previous = text
+
+def check_scores(rnd, rounds):
+    '''
+    team_scores的NumPy实现与逐个提交的Python实现结果相同：包括不在队伍列表里的队伍、没有队伍、
+    通过前后重复的WA/CE、带小数的比赛时间、没有提交
+    '''
+    if numpy() is None:
+        return 'skipped (numpy is not installed)'
+    for _ in range(rounds):
+        team_ids = ['t%d' % idx for idx in rnd.sample(range(30), rnd.randrange(0, 20))]
+        problem_ids = [str(idx) for idx in range(rnd.randrange(1, 8))]
+        seconds, submissions = 0.0, []
+        for idx in range(rnd.randrange(0, 300)):
+            # 队伍和题目都很少，同一队伍同一题通过前后都会有多次WA/CE；时间相同或只差几毫秒
+            seconds += rnd.choice([0, 0.001, rnd.uniform(0, 120)])
+            judgement_type = rnd.choice(JUDGEMENT_TYPES)
+            submissions.append(Submission(str(idx + 1), 't%d' % rnd.randrange(30), rnd.choice(problem_ids), seconds, judgement_type))
+        penalty_seconds = rnd.choice([0, 60, 1200])
+        expected = team_scores_python(team_ids, submissions, penalty_seconds)
+        assert team_scores_numpy(team_ids, submissions, penalty_seconds) == expected, (team_ids, penalty_seconds)
+
+CHECKS = {
+    'ranking': check_ranking,
+    'json_stream': check_json_stream,
+    'delta': check_delta,
+    'scores': check_scores,
+}
+
+def main():
+    parser = ArgumentParser(description='randomized checks of the optimized structures against straightforward implementations')
+    parser.add_argument('check', nargs='*', help='checks to run (%s), default all' % ', '.join(CHECKS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rounds', type=int, default=200)
+    argument = parser.parse_args()
+    for name in argument.check:
+        if name not in CHECKS:
+            parser.error("unknown check %s, expected one of %s" % (name, ', '.join(CHECKS)))
+    for name in argument.check or list(CHECKS):
+        note = CHECKS[name](random.Random(argument.seed), argument.rounds)
+        print ("%-12s %s" % (name, note or 'ok (seed %d, %d rounds)' % (argument.seed, argument.rounds)))
+
+if __name__ == '__main__':
+    main()
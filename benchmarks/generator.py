@@ -0,0 +1,163 @@
+import json
+import os
+import random
+from argparse import ArgumentParser
+
+JUDGEMENT_TYPES = [
+    { 'id': 'AC', 'name': 'correct', 'solved': True, 'penalty': False },
+    { 'id': 'WA', 'name': 'wrong answer', 'solved': False, 'penalty': True },
+    { 'id': 'TLE', 'name': 'timelimit', 'solved': False, 'penalty': True },
+    { 'id': 'RTE', 'name': 'run-error', 'solved': False, 'penalty': True },
+    { 'id': 'CE', 'name': 'compiler-error', 'solved': False, 'penalty': False },
+]
+VERDICTS = ['AC', 'WA', 'WA', 'TLE', 'RTE', 'CE']
+DURATION = 5 * 3600
+
+def reltime(ms, fraction=True):
+    text = "%d:%02d:%02d" % (ms // 3600000, ms // 60000 % 60, ms // 1000 % 60)
+    return text + ".%03d" % (ms % 1000) if fraction else text
+
+def generate(directory, teams=50, problems=10, submissions=5000, seed=0):
+    '''
+    生成一场虚拟比赛::
+
+        - directory/<endpoint>.json   domjudge REST接口的返回内容
+        - directory/pta-feed.ndjson   PTA格式的event-feed
+    '''
+    rnd = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    contest = {
+        'id': '1', 'name': 'Synthetic Contest', 'shortname': 'synthetic', 'formal_name': 'Synthetic Contest',
+        'start_time': '2024-05-02T09:00:00+08:00', 'duration': reltime(DURATION * 1000),
+        'scoreboard_freeze_duration': '1:00:00.000', 'penalty_time': 20,
+    }
+    groups = [
+        { 'id': '3', 'name': '正式队伍', 'hidden': False },
+        { 'id': '4', 'name': '打星队伍', 'hidden': False },
+        { 'id': '5', 'name': '女队', 'hidden': False },
+        { 'id': '9', 'name': 'Observers', 'hidden': True },
+    ]
+    organizations = [{
+        'id': str(idx), 'icpc_id': str(idx), 'name': 'U%d' % idx, 'shortname': 'U%d' % idx,
+        'formal_name': 'University %d' % idx,
+    } for idx in range(max(1, teams // 3))]
+    team_list = []
+    for idx in range(teams):
+        group = rnd.choices(['3', '4', '5', '9'], [80, 8, 7, 5])[0]
+        team_list.append({
+            'id': str(1000 + idx), 'icpc_id': str(50000 + idx), 'name': 'Team %d' % idx,
+            'organization_id': rnd.choice(organizations)['id'],
+            'group_ids': ['3', '5'] if group == '5' else [group],
+            'affiliation': 'University', 'public_description': 'A、B、C',
+        })
+    problem_list = [{
+        'id': str(idx + 1), 'ordinal': idx, 'label': chr(65 + idx), 'short_name': chr(65 + idx),
+        'name': 'Problem %s' % chr(65 + idx),
+    } for idx in range(problems)]
+
+    # 每个队伍有不同的实力，每道题有不同的难度
+    strength = { team['id']: rnd.random() for team in team_list }
+    difficulty = [rnd.random() for _ in problem_list]
+    submission_list, judgement_list = [], []
+    for idx, ms in enumerate(sorted(rnd.randrange(DURATION * 1000) for _ in range(submissions))):
+        team = rnd.choice(team_list)
+        problem = rnd.randrange(problems)
+        submission = {
+            'id': str(idx + 1), 'team_id': team['id'], 'problem_id': problem_list[problem]['id'], 'language_id': 'cpp',
+            'time': '2024-05-02T09:00:00+08:00', 'contest_time': reltime(ms),
+        }
+        submission_list.append(submission)
+        verdict = 'AC' if rnd.random() < strength[team['id']] * (1 - difficulty[problem]) else rnd.choice(VERDICTS[1:])
+        if rnd.random() < 0.02:
+            # 重判前的旧评测
+            judgement_list.append({ 'id': str(len(judgement_list) + 1), 'submission_id': submission['id'], 'judgement_type_id': rnd.choice(VERDICTS), 'valid': False })
+        judgement_list.append({ 'id': str(len(judgement_list) + 1), 'submission_id': submission['id'], 'judgement_type_id': verdict, 'valid': True })
+    # 比赛结束前的最后两个提交：一个还在排队（没有评测），一个正在评测（judgement_type_id为空）
+    visible = [team for team in team_list if '9' not in team['group_ids']]
+    for idx, problem in enumerate(problem_list[:2]):
+        submission = {
+            'id': str(len(submission_list) + 1), 'team_id': visible[idx]['id'], 'problem_id': problem['id'], 'language_id': 'cpp',
+            'time': '2024-05-02T09:00:00+08:00', 'contest_time': reltime(DURATION * 1000 - 1000 + idx),
+        }
+        submission_list.append(submission)
+        if idx == 1:
+            judgement_list.append({ 'id': str(len(judgement_list) + 1), 'submission_id': submission['id'], 'judgement_type_id': None, 'valid': True })
+
+    rest = {
+        'contest': contest, 'groups': groups, 'organizations': organizations, 'teams': team_list,
+        'submissions': submission_list, 'judgements': judgement_list, 'judgement-types': JUDGEMENT_TYPES,
+        'problems': problem_list, 'scoreboard': scoreboard(contest, team_list, groups, submission_list, judgement_list),
+    }
+    for name, data in rest.items():
+        with open(os.path.join(directory, name + '.json'), 'w', encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    write_pta_feed(os.path.join(directory, 'pta-feed.ndjson'), rnd, rest)
+
+def scoreboard(contest, teams, groups, submissions, judgements):
+    hidden = { group['id'] for group in groups if group['hidden'] }
+    verdict = { judgement['submission_id']: judgement['judgement_type_id'] for judgement in judgements if judgement['valid'] }
+    penalty = { judgement_type['id']: judgement_type['penalty'] for judgement_type in JUDGEMENT_TYPES }
+    solved, wrong, score = set(), {}, {}
+    for submission in submissions:
+        key = (submission['team_id'], submission['problem_id'])
+        if key in solved:
+            continue
+        result = verdict.get(submission['id'])
+        if result is None:
+            continue
+        if result == 'AC':
+            solved.add(key)
+            minutes = int(submission['contest_time'].split(':')[0]) * 60 + int(submission['contest_time'].split(':')[1])
+            num_solved, total_time = score.get(key[0], (0, 0))
+            score[key[0]] = (num_solved + 1, total_time + minutes + wrong.get(key, 0) * contest['penalty_time'])
+        elif penalty[result]:
+            wrong[key] = wrong.get(key, 0) + 1
+    rows = []
+    for team in teams:
+        if hidden & set(team['group_ids']):
+            continue
+        num_solved, total_time = score.get(team['id'], (0, 0))
+        rows.append({ 'rank': 0, 'team_id': team['id'], 'score': { 'num_solved': num_solved, 'total_time': total_time } })
+    rows.sort(key = lambda row: (-row['score']['num_solved'], row['score']['total_time']))
+    for idx, row in enumerate(rows):
+        row['rank'] = idx + 1
+    return { 'rows': rows }
+
+def write_pta_feed(filename, rnd, rest):
+    # PTA的比赛时间不带毫秒，组别为本科(1)/专科(2)
+    def event(f, info_type, data):
+        f.write(json.dumps({ 'type': info_type, 'id': None, 'data': data }, ensure_ascii=False) + '\n')
+    with open(filename, 'w', encoding="utf-8") as f:
+        event(f, 'state', { 'started': rest['contest']['start_time'] })
+        event(f, 'contests', dict(rest['contest'], duration='5:00:00', scoreboard_freeze_duration='1:00:00'))
+        for judgement_type in rest['judgement-types']:
+            event(f, 'judgement-types', judgement_type)
+        event(f, 'languages', { 'id': 'cpp', 'name': 'C++' })
+        for problem in rest['problems']:
+            event(f, 'problems', problem)
+        event(f, 'groups', { 'id': 1, 'name': '本科' })
+        event(f, 'groups', { 'id': 2, 'name': '专科' })
+        for organization in rest['organizations']:
+            event(f, 'organizations', organization)
+        for team in rest['teams']:
+            event(f, 'teams', dict(team, group_ids=[rnd.choice([1, 1, 1, 2])]))
+            for idx in range(3):
+                event(f, 'persons', { 'id': '%s-%d' % (team['id'], idx), 'team_id': team['id'], 'name': 'Member %s-%d' % (team['id'], idx) })
+        for submission in rest['submissions']:
+            event(f, 'submissions', dict(submission, contest_time=submission['contest_time'].split('.')[0]))
+        for judgement in rest['judgements']:
+            if judgement['valid']:
+                event(f, 'judgements', { key: judgement[key] for key in ('id', 'submission_id', 'judgement_type_id') })
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('directory', help='output directory')
+    parser.add_argument('--teams', type=int, default=50)
+    parser.add_argument('--problems', type=int, default=10)
+    parser.add_argument('--submissions', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    argument = parser.parse_args()
+    generate(argument.directory, argument.teams, argument.problems, argument.submissions, argument.seed)
+
+if __name__ == '__main__':
+    main()
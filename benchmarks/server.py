@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import threading
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+from utils.serve import ExportServer
+
+CONTEST_PREFIX = '/api/v4/contests/1'
+
+class ContestHandler(BaseHTTPRequestHandler):
+    '''
+    把generator生成的目录当作domjudge服务::
+
+        /api/v4/contests/1/<endpoint>  -> <endpoint>.json
+        /pta/event-feed                -> pta-feed.ndjson
+
+    集合接口支持domjudge的ids[]与category过滤参数
+    '''
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path, query = url.path.rstrip('/'), parse_qs(url.query)
+        if path == '/pta/event-feed':
+            filename = 'pta-feed.ndjson'
+        elif path == CONTEST_PREFIX:
+            filename = 'contest.json'
+        elif path.startswith(CONTEST_PREFIX + '/'):
+            filename = path[len(CONTEST_PREFIX) + 1:] + '.json'
+        else:
+            filename = None
+        filename = os.path.join(self.server.directory, filename) if filename else None
+        if filename is None or not os.path.isfile(filename):
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(filename, 'rb') as f:
+            body = f.read()
+        if 'ids[]' in query or 'category' in query:
+            body = self.filter(json.loads(body), query)
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def filter(self, items, query):
+        if 'ids[]' in query:
+            items = [item for item in items if item['id'] in query['ids[]']]
+        if 'category' in query:
+            items = [item for item in items if query['category'][0] in item.get('group_ids', [])]
+        return json.dumps(items, ensure_ascii=False).encode()
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(directory, port=0):
+    server = ExportServer(('127.0.0.1', port), ContestHandler)
+    server.directory = directory
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('directory', help='directory created by benchmarks.generator')
+    parser.add_argument('--port', type=int, default=8000)
+    argument = parser.parse_args()
+    server = ExportServer(('127.0.0.1', argument.port), ContestHandler)
+    server.directory = argument.directory
+    print ("serving %s on http://127.0.0.1:%d%s" % (argument.directory, argument.port, CONTEST_PREFIX))
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -1,39 +1,111 @@
-import json
-import requests
-from html import escape
-from functools import reduce
-
-from requests.auth import HTTPBasicAuth
-
-from utils.XML import XML_dump
+from urllib.parse import quote, urlencode
+
+from utils.cdp import fetch_assets
+from utils.compression import AtomicOutput, compressed_name
+from utils.config_loader import check_output_format
+from utils.NDJSON import NDJSON_write, resolver_events
+from utils.XML import XML_segments, XML_write
+from utils.delta import delta_write
+from utils.event_feed import EventFeed
+from utils.fetcher import Fetcher
+from utils.index import ContestIndex
+from utils.profiler import profiler
+from utils.records import Team, Submission, Judgement, TeamAttributes
+from utils.scoreboard import team_scores, rank_rows
+from utils.snapshot import save_snapshot, load_snapshot
+from utils.store import JudgementStore
 from utils.utils import dtime2timestamp, ctime2timestamp, make_ordinal
 
 class DOMjudge:
 
-    def __init__(self, config):
+    # prep_data之后的全部状态，与评奖配置无关，可保存为快照
+    SNAPSHOT_FIELDS = ('contest_info', 'groups', 'organizations', 'teams', 'team_dict', 'submissions', 'judgements',
+                       'judgement_types', 'problems', 'scoreboard', 'start_time', 'contest_length', 'freeze_start', 'index')
+
+    def __init__(self, config, snapshot=''):
         self.config = config
         self.award_list = ['"team id","tean name","team group","team affiliation","award","team members"']
-        self.load_data()
-        self.prep_data()
-
-    def API(self, method):
-        req_url = self.config['url'] + method
-        print ("[   ] GET %s" % req_url, end='\r')
-        res = requests.get(req_url, auth=HTTPBasicAuth(self.config['username'], self.config['password']), verify=False)
-        print ("[%d] GET %s" % (res.status_code, req_url))
-        return json.loads(res.text)
+        # 第一次拉取数据时才创建，从快照恢复时不需要联网
+        self.fetcher = None
+        self.pending = {}
+        self.feed = None
+        self.ranking = None
+        if snapshot != '':
+            # 从快照恢复时跳过下载和预处理，只重新评奖和导出
+            with profiler.phase('load-snapshot'):
+                self.__dict__.update(load_snapshot(snapshot, 'domjudge'))
+            return
+        self.refresh()
+
+    def refresh(self):
+        # 重新拉取并预处理全部数据；连接池、响应缓存和event-feed位置保留，可以反复调用
+        if self.fetcher is None:
+            self.fetcher = Fetcher(self.config)
+        with profiler.phase('load'):
+            self.load_data()
+        with profiler.phase('prep'):
+            self.prep_data()
+
+    def save_snapshot(self, filename):
+        with profiler.phase('save-snapshot'):
+            save_snapshot(filename, 'domjudge', { field: getattr(self, field) for field in self.SNAPSHOT_FIELDS })
+
+    def API(self, method, stream=False):
+        if method in self.pending:
+            return self.pending.pop(method).result()
+        if self.feed is not None and self.feed.has(method):
+            return self.feed.collection(method)
+        if stream:
+            # 逐个返回数组元素，调用方过滤后再保存
+            return self.fetcher.items(self.config['url'] + method)
+        return self.fetcher.get_json(self.config['url'] + method)
+
+    def API_all(self, methods):
+        self.prefetch(methods)
+        return [item for method in methods for item in self.API(method)]
+
+    def prefetch(self, methods):
+        for method in methods:
+            self.pending[method] = self.fetcher.submit(self.config['url'] + method)
 
     def load_data(self):
+        self.server_filter = self.config.get('server_filter', False)
+        # stream_json: 提交和评测边下载边解析过滤，不预先并发请求
+        self.stream = self.config.get('stream_json', False)
+        if self.config.get('event_feed', '') != '':
+            self.server_filter = False
+            self.load_event_feed()
+        elif self.server_filter:
+            # 队伍按组别请求，学校按队伍请求，分别在load_teams/load_organizations中发起
+            self.prefetch(['/', '/groups', '/judgement-types', '/problems', '/scoreboard'] + self.collections())
+        else:
+            # 所有接口并发请求，下面的load_*按依赖顺序等待各自的结果
+            self.prefetch(['/', '/groups', '/organizations', '/teams', '/judgement-types', '/problems', '/scoreboard'] + self.collections())
         self.load_contest_info()
         self.load_groups()
-        self.load_organizations()
         self.load_teams()
+        self.load_organizations()
         self.load_submissions()
         self.load_judgements()
         self.load_judgement_types()
         self.load_problems()
         self.load_scoreboard()
 
+    def submissions_method(self):
+        # strict只返回CLICS规范中的字段
+        return '/submissions?strict=true' if self.server_filter else '/submissions'
+
+    def collections(self):
+        return [] if self.stream else [self.submissions_method(), '/judgements']
+
+    def load_event_feed(self):
+        # 从上次保存的事件位置继续，只拉取新事件；榜单仍由REST接口获取
+        if self.feed is None:
+            self.feed = EventFeed(self.config['event_feed'])
+        self.prefetch(['/scoreboard'])
+        self.feed.follow(self.fetcher, self.config['url'])
+        self.feed.save()
+
     def load_contest_info(self):
         self.contest_info = self.API("/")
 
@@ -46,33 +118,45 @@ class DOMjudge:
             self.groups[group['id']] = group
 
     def load_organizations(self):
-        organizations = self.API("/organizations")
+        if self.server_filter:
+            # 只请求参赛队伍所属的学校，ids[]过长时分批请求
+            ids = list(dict.fromkeys(team.organization_id for team in self.teams if team.organization_id is not None))
+            size = self.config.get('chunk_size', 100)
+            organizations = self.API_all(['/organizations?' + urlencode([('ids[]', id) for id in ids[start:start + size]]) for start in range(0, len(ids), size)])
+        else:
+            organizations = self.API("/organizations")
         # print(organizations)
         self.organizations = {}
         for organization in organizations:
             self.organizations[organization['id']] = organization
 
     def load_teams(self):
-        teams = self.API("/teams")
-        group_ids = [group['id'] for group in self.groups.values()]
-        same = lambda x, y: list(set(x) & set(y))
-        func = lambda team: len(same(team['group_ids'], group_ids))
-        self.teams = list(filter(func, teams))
+        if self.server_filter:
+            # 隐藏组别的队伍不下载，属于多个组别的队伍会重复返回
+            teams = self.API_all(['/teams?category=%s' % quote(str(group_id)) for group_id in self.groups])
+        else:
+            teams = self.API("/teams")
+        func = lambda data: not self.groups.keys().isdisjoint(data['group_ids'])
         self.team_dict = {}
-        for team in self.teams:
-            self.team_dict[team['id']] = team
+        for data in teams:
+            if func(data) and data['id'] not in self.team_dict:
+                self.team_dict[data['id']] = Team.from_json(data)
+        self.teams = list(self.team_dict.values())
 
     def load_submissions(self):
-        submissions = self.API('/submissions')
-        team_ids = [team['id'] for team in self.teams]
-        func = lambda submission: submission['team_id'] in team_ids
-        self.submissions = list(filter(func, submissions))
+        submissions = self.API(self.submissions_method(), self.stream)
+        func = lambda data: data['team_id'] in self.team_dict
+        self.submissions = [Submission.from_json(data) for data in submissions if func(data)]
 
     def load_judgements(self):
-        judgements = self.API('/judgements')
-        submission_ids = [submission['id'] for submission in self.submissions]
-        func = lambda judgement: judgement['valid'] and judgement['submission_id'] in submission_ids
-        self.judgements = list(filter(func, judgements))
+        judgements = self.API('/judgements', self.stream)
+        submission_ids = { submission.id for submission in self.submissions }
+        # 每个提交只保留当前有效且已出结果的评测，重测产生的旧评测被覆盖或删除
+        store = JudgementStore(record=Judgement)
+        for data in judgements:
+            if data['submission_id'] in submission_ids:
+                store.upsert(data)
+        self.judgements = list(store.values())
 
     def load_judgement_types(self):
         self.judgement_types = self.API('/judgement-types')
@@ -84,45 +168,73 @@ class DOMjudge:
         self.scoreboard = self.API('/scoreboard')
 
     def prep_data(self):
+        self.prep_contest_time()
+        self.index = ContestIndex(self.teams, self.judgements)
         self.submission_judgement_type()
         self.scoreboard_rank()
 
+    def prep_contest_time(self):
+        # 比赛常量只解析一次，提交的比赛时间在构造Submission时已转换为秒
+        self.start_time = dtime2timestamp(self.contest_info['start_time'])
+        self.contest_length = ctime2timestamp(self.contest_info['duration'])
+        self.freeze_start = self.contest_length - ctime2timestamp(self.contest_info['scoreboard_freeze_duration'])
+
     def submission_judgement_type(self):
-        id2idx = { submission['id']: idx for idx, submission in enumerate(self.submissions) }
         judgement_types = { judgement_type['id']: judgement_type for judgement_type in self.judgement_types }
-        for judgement in self.judgements:
-            idx = id2idx[judgement['submission_id']]
-            self.submissions[idx]['judgement_type'] = judgement_types[judgement['judgement_type_id']]
+        for submission in self.submissions:
+            # 没有评测或评测中的提交为None，不计入分数和奖项
+            judgement = self.index.submission_judgement.get(submission.id)
+            submission.judgement_type = None if judgement is None else judgement_types[judgement.judgement_type_id]
 
     def scoreboard_rank(self):
+        # 总罚时以domjudge榜单为准，这里只补充各题首次通过提交id的最大值用于排序
+        scores = team_scores(list(self.team_dict), self.submissions, 0)
         for row in self.scoreboard['rows']:
-            team_solved_func = lambda submission: submission['team_id'] == row['team_id'] and submission['judgement_type']['solved']
-            team_submissions = list(filter(team_solved_func, self.submissions))
-            max_submission_id, problems = 0, set()
-            for submission in team_submissions:
-                if submission['problem_id'] in problems:
-                    continue
-                problems.add(submission['problem_id'])
-                max_submission_id = max(max_submission_id, int(submission['id']))
-            row['score']['max_submission_id'] = max_submission_id
-        self.scoreboard['rows'].sort(key = lambda x: (-x['score']['num_solved'], x['score']['total_time'], x['score']['max_submission_id']))
-        self.scoreboard['rows'][0]['rank'] = 1
-        for idx in range(len(self.scoreboard['rows']) - 1):
-            self.scoreboard['rows'][idx + 1]['rank'] = idx + 2
-            if self.scoreboard['rows'][idx]['score'] == self.scoreboard['rows'][idx + 1]['score']:
-                self.scoreboard['rows'][idx + 1]['rank'] = self.scoreboard['rows'][idx]['rank']
-    
-    def export(self, filename):
-        self.export_XML(filename + '.xml')
-        self.export_result(filename + '.csv')
+            row['score']['max_submission_id'] = scores[row['team_id']][2] if row['team_id'] in scores else 0
+        # 保留上一次的排名结构，--watch刷新时只移动分数有变化的队伍
+        self.ranking = rank_rows(self.scoreboard['rows'], self.ranking)
 
+    def export(self, filename):
+        # output_format: xml（默认）、json或both，两种格式由同一份resolver_*_formatter数据生成
+        output_format = check_output_format(self.config)
+        compress = self.config.get('compress', '')
+        changed = False
+        if output_format in ('xml', 'both'):
+            with profiler.phase('export-xml'):
+                changed |= self.export_XML(compressed_name(filename + '.xml', compress))
+        if output_format in ('json', 'both'):
+            with profiler.phase('export-feed'):
+                changed |= self.export_feed(compressed_name(filename + '.ndjson', compress))
+        with profiler.phase('export-csv'):
+            changed |= self.export_result(compressed_name(filename + '.csv', compress))
+        return changed
+
+    def export_cdp(self, directory, layout='2.4'):
+        # 下载Resolver CDP目录需要的队伍照片、学校logo和比赛banner
+        if self.fetcher is None:
+            self.fetcher = Fetcher(self.config)
+        with profiler.phase('export-cdp'):
+            return fetch_assets(self.fetcher, self.config['url'], self.teams, directory, layout)
+
+    # 先写临时文件再替换，Resolver不会读到写了一半的文件；内容没有变化时保留原文件，返回是否有变化
     def export_XML(self, filename):
-        with open(filename, 'w', encoding="utf-8") as f:
-           f.write(XML_dump(self.resolver_formatter()))
+        compact = self.config.get('compact_xml', False)
+        if self.config.get('delta_xml', False) and self.config.get('compress', '') == '':
+            # 只重写第一个变化的元素之后的部分
+            return delta_write(filename, XML_segments(self.resolver_formatter(), compact))
+        with AtomicOutput(filename) as output:
+            XML_write(output.file, self.resolver_formatter(), compact)
+        return output.changed
+
+    def export_feed(self, filename):
+        with AtomicOutput(filename) as output:
+            NDJSON_write(output.file, resolver_events(self.resolver_contest_formatter(), self.judgement_types))
+        return output.changed
 
     def export_result(self, filename):
-        with open(filename, 'w', encoding="utf-8") as f:
-           f.write('\n'.join(self.award_list))
+        with AtomicOutput(filename) as output:
+           output.file.write('\n'.join(self.award_list))
+        return output.changed
 
     def resolver_formatter(self):
         return { 'contest': self.resolver_contest_formatter() }
@@ -152,7 +264,7 @@ class DOMjudge:
             'short-title': self.contest_info['shortname'],
             'length': self.contest_info['duration'],
             'scoreboard-freeze-length': self.contest_info['scoreboard_freeze_duration'],
-            'starttime': dtime2timestamp(self.contest_info['start_time']),
+            'starttime': self.start_time,
             'penalty': self.contest_info['penalty_time'],
         }
 
@@ -171,38 +283,65 @@ class DOMjudge:
         } for problem in self.problems ]
 
     def resolver_team_formatter(self):
-        return [{
-            'id': team['id'],
-            'external-id': team['icpc_id'],
-            'name': self.organizations[team['organization_id']]['formal_name'] + ' - ' + escape(team['name']),
-            'university': self.organizations[team['organization_id']]['formal_name'],
-            'university-short-name': self.organizations[team['organization_id']]['shortname'],
-            'region': self.groups[team['group_ids'][0]]['name'],
-        } for team in self.teams ]
+        return ({
+            'id': team.id,
+            'external-id': team.icpc_id,
+            'name': self.organizations[team.organization_id]['formal_name'] + ' - ' + team.name,
+            'university': self.organizations[team.organization_id]['formal_name'],
+            'university-short-name': self.organizations[team.organization_id]['shortname'],
+            'region': self.groups[team.group_ids[0]]['name'],
+        } for team in self.teams)
 
     def resolver_run_formatter(self):
         problems = { problem['id']: problem for problem in self.problems }
-        return [{
-            'id': submission['id'],
-            'problem': problems[submission['problem_id']]['ordinal'] + 1,
-            'team': submission['team_id'],
+        return (self.resolver_run(submission, problems) for submission in self.submissions)
+
+    def resolver_run(self, submission, problems):
+        if submission.judgement_type is None:
+            # 还没有评测结果的提交
+            return {
+                'id': submission.id,
+                'problem': problems[submission.problem_id]['ordinal'] + 1,
+                'team': submission.team_id,
+                'judged': "false",
+                'time': submission.contest_seconds
+            }
+        return {
+            'id': submission.id,
+            'problem': problems[submission.problem_id]['ordinal'] + 1,
+            'team': submission.team_id,
             'judged': "true",
-            'result': submission['judgement_type']['id'],
-            'solved': str(submission['judgement_type']['solved']).lower(),
-            'penalty': str(submission['judgement_type']['penalty']).lower(),
-            'time': ctime2timestamp(submission['contest_time'])
-        } for submission in self.submissions ]
+            'result': submission.judgement_type['id'],
+            'solved': str(submission.judgement_type['solved']).lower(),
+            'penalty': str(submission.judgement_type['penalty']).lower(),
+            'time': submission.contest_seconds
+        }
 
     def resolver_award_formatter(self):
-        return reduce(lambda x, y: x + y, [
-            self.resolver_award_winner_formatter(),
-            self.resolver_award_top_team_formatter(3),
-            self.resolver_award_medal_formatter(),
-            self.resolver_award_best_girl_formatter(),
-            self.resolver_award_first_solved_formatter(),
-            self.resolver_award_last_AC_formatter()
-            # self.resolver_award_first_WA()
-        ], [])
+        # 每次导出重新评奖，同时导出xml和json时获奖名单不重复
+        self.award_list = self.award_list[:1]
+        self.prep_team_attributes()
+        # 逐个调用，最佳女队依赖奖牌评完后的self.limited
+        yield from self.resolver_award_winner_formatter()
+        yield from self.resolver_award_top_team_formatter(3)
+        yield from self.resolver_award_medal_formatter()
+        yield from self.resolver_award_best_girl_formatter()
+        yield from self.resolver_award_first_solved_formatter()
+        yield from self.resolver_award_last_AC_formatter()
+        # yield from self.resolver_award_first_WA()
+
+    def prep_team_attributes(self):
+        # 评奖用到的队伍属性每次导出只计算一次，之后O(1)查询
+        no_occupy = { str(group_id) for group_id in self.config['no_occupy_award_categories'] }
+        best_girl = { str(group_id) for group_id in self.config['award_best_girl'] }
+        self.team_attributes = {}
+        for team in self.teams:
+            group_ids = { str(group_id) for group_id in team.group_ids }
+            self.team_attributes[team.id] = TeamAttributes(
+                group_ids.isdisjoint(no_occupy),
+                not group_ids.isdisjoint(best_girl),
+                '、'.join(self.groups[group_id]['name'] for group_id in team.group_ids if group_id in self.groups),
+                team.affiliation)
 
     def award(self, id, citation, team_ids):
         if type(team_ids) != list:
@@ -210,11 +349,11 @@ class DOMjudge:
         else:
             teams = team_ids
         for team_id in teams:
-            team = self.team_dict[team_id]
-            category = team["affiliation"]
-            group = self.get_team_group_name(team_id)
-            members = team["public_description"]
-            self.award_list.append(f'"{team_id}","{team["name"]}","{group}","{category}","{citation}","{members}"')
+            team, attributes = self.team_dict[team_id], self.team_attributes[team_id]
+            category = attributes.affiliation
+            group = attributes.group_name
+            members = team.members
+            self.award_list.append(f'"{team_id}","{team.name}","{group}","{category}","{citation}","{members}"')
         return {
             'id': id,
             'citation': citation,
@@ -223,49 +362,43 @@ class DOMjudge:
         }
 
     def get_team_categories_id(self, team_id):
-        return self.team_dict[team_id]["group_ids"]
+        return self.team_dict[team_id].group_ids
 
     def team_in_group(self, team_id, check_groups):
-        check_groups = [str(i) for i in check_groups]
-        groups = self.get_team_categories_id(team_id)
-        for group_id in groups:
-            if group_id in check_groups:
-                return True
-        return False
+        return self.index.team_in_groups(team_id, check_groups)
 
     def team_award_occupy(self, team_id):
-        return not self.team_in_group(team_id, self.config['no_occupy_award_categories'])
+        return self.team_attributes[team_id].occupy
 
     def get_team_group_name(self, team_id):
-        group_name = [] 
-        for group_id in self.team_dict[team_id]["group_ids"]:
-            group_name.append(self.groups[group_id]["name"])
-        return '、'.join(group_name)
+        return self.team_attributes[team_id].group_name
 
     def resolver_award_first_solved_formatter(self):
         first_solved, first_solved_award = [ False for _ in range(len(self.problems)) ], []
         problem_id2idx = { problem['id']: problem['ordinal'] for problem in self.problems }
+        attributes = self.team_attributes
         for submission in self.submissions:
-            if not submission['judgement_type']['solved']:
+            if submission.judgement_type is None or not submission.judgement_type['solved']:
                 continue
-            if not self.team_award_occupy(submission['team_id']): #打星队伍不评奖
+            if not attributes[submission.team_id].occupy: #打星队伍不评奖
                 continue
-            if ctime2timestamp(submission['contest_time']) >= ctime2timestamp(self.contest_info['duration']) - ctime2timestamp(self.contest_info['scoreboard_freeze_duration']):
+            if submission.contest_seconds >= self.freeze_start:
                 continue
-            idx = problem_id2idx[submission['problem_id']]
+            idx = problem_id2idx[submission.problem_id]
             if first_solved[idx]:
                 continue
             first_solved[idx] = True
-            first_solved_award.append(self.award('first-to-solve-%c' % chr(65 + idx), 'First to solve problem %c' % chr(65 + idx), submission['team_id']))
+            first_solved_award.append(self.award('first-to-solve-%c' % chr(65 + idx), 'First to solve problem %c' % chr(65 + idx), submission.team_id))
         return first_solved_award
 
     def resolver_award_top_team_formatter(self, rank):  #WARNING: 排名相同无法一起评
         buf = [[] for _ in range(rank + 1)]
         cnt = 0
+        attributes = self.team_attributes
         for row in self.scoreboard['rows']:
             if cnt == rank:
                 break
-            if not self.team_award_occupy(row['team_id']): #打星队伍不评奖
+            if not attributes[row['team_id']].occupy: #打星队伍不评奖
                 continue
             cnt += 1
             buf[cnt].append(row['team_id'])
@@ -292,7 +425,7 @@ class DOMjudge:
     def resolver_award_best_girl_formatter(self):
         best_girls_team_id = -1
         for row in self.scoreboard['rows']:
-            if self.team_in_group(row['team_id'], self.config['award_best_girl']):
+            if self.team_attributes[row['team_id']].best_girl:
                 best_girls_team_id = row['team_id']
                 break
             if row['rank'] > self.limited: # 限定最佳女队必得奖牌
@@ -304,60 +437,38 @@ class DOMjudge:
 
     def resolver_award_medal_formatter(self):
         medal_team_award = []
-        # award for gold
-        totle = self.config['gold']
-        buf = []
+        attributes, rows = self.team_attributes, self.scoreboard['rows']
         pos = 0
-        if totle > 0:
-            while totle > 0:
-                row = self.scoreboard['rows'][pos]
-                if not self.team_award_occupy(row['team_id']): #打星队伍不占用获奖名额
-                    totle += 1
-                buf.append(row['team_id'])
-                totle -= 1
-                pos += 1
-            medal_team_award.append(self.award("gold-medal", "Gold Medalist", buf))
-        # award for silver
-        totle = self.config['silver']
-        buf = []
-        if totle > 0:
-            while totle > 0:
-                row = self.scoreboard['rows'][pos]
-                if not self.team_award_occupy(row['team_id']): #打星队伍不占用获奖名额
-                    totle += 1
-                buf.append(row['team_id'])
-                totle -= 1
-                pos += 1
-            medal_team_award.append(self.award("silver-medal", "Silver Medalist", buf))
-        # award for bronze
-        totle = self.config['bronze']
-        buf = []
-        if totle > 0:
-            while totle > 0:
-                row = self.scoreboard['rows'][pos]
-                if not self.team_award_occupy(row['team_id']): #打星队伍不占用获奖名额
-                    totle += 1
-                buf.append(row['team_id'])
-                totle -= 1
-                pos += 1
-            medal_team_award.append(self.award("bronze-medal", "Bronze Medalist", buf))
+        # 金银铜依次从上一档结束的位置继续，整个榜单只扫一遍
+        for medal, citation in [("gold", "Gold Medalist"), ("silver", "Silver Medalist"), ("bronze", "Bronze Medalist")]:
+            totle = self.config[medal]
+            buf = []
+            if totle > 0:
+                while totle > 0:
+                    row = rows[pos]
+                    if not attributes[row['team_id']].occupy: #打星队伍不占用获奖名额
+                        totle += 1
+                    buf.append(row['team_id'])
+                    totle -= 1
+                    pos += 1
+                medal_team_award.append(self.award(f"{medal}-medal", citation, buf))
         self.limited = pos - 1
         return medal_team_award
 
     def resolver_award_last_AC_formatter(self):
-        submissions = list(filter(lambda submission: submission['judgement_type']['id'] == "AC", self.submissions))
-        if len(submissions) == 0:
+        submission = next((submission for submission in reversed(self.submissions) if submission.judgement_type is not None and submission.judgement_type['id'] == "AC"), None)
+        if submission is None:
             return []
         return [
-            self.award("last-AC", "Tenacious Award", submissions[-1]['team_id'])
+            self.award("last-AC", "Tenacious Award", submission.team_id)
         ]
 
     def resolver_award_first_WA(self):
-        submissions = list(filter(lambda submission: submission['judgement_type']['id'] == "WA", self.submissions))
+        submissions = list(filter(lambda submission: submission.judgement_type is not None and submission.judgement_type['id'] == "WA", self.submissions))
         if len(submissions) == 0:
             return []
         return [
-            self.award("first-WA", "First WA", submissions[0]['team_id'])
+            self.award("first-WA", "First WA", submissions[0].team_id)
         ]
 
     def resolver_finalized_formatter(self):
@@ -1,37 +1,69 @@
 import json
-import requests
-from html import escape
-from functools import reduce
 
-from requests.auth import HTTPBasicAuth
-
-from utils.XML import XML_dump
+from utils.compression import AtomicOutput, compressed_name, open_input
+from utils.config_loader import check_output_format
+from utils.NDJSON import NDJSON_write, resolver_events
+from utils.XML import XML_segments, XML_write
+from utils.delta import delta_write
+from utils.fetcher import Fetcher
+from utils.index import ContestIndex
+from utils.profiler import profiler
+from utils.records import Team, Submission, Judgement
+from utils.scoreboard import team_scores, rank_rows
+from utils.snapshot import save_snapshot, load_snapshot
+from utils.store import JudgementStore, Store, apply_event
 from utils.utils import dtime2timestamp, ctime2timestamp, make_ordinal_zh, randomstr
 
 class PTA_school:
 
-    def __init__(self, config):
+    # prep_data之后的全部状态，与评奖配置无关，可保存为快照
+    SNAPSHOT_FIELDS = ('contest_info', 'judgement_type_dict', 'problem_dict', 'groups', 'organizations', 'team_dict', 'members',
+                       'submission_dict', 'judgement_dict', 'teams', 'submissions', 'judgements', 'judgement_types', 'problems',
+                       'scoreboard', 'start_time', 'contest_length', 'freeze_start', 'index')
+
+    def __init__(self, config, snapshot=''):
         self.config = config
         self.award_list = ['"team id","tean name","team group","team affiliation","award","team members"']
-        self.raw_judgement_types = []
-        self.raw_problems = []
-        self.raw_teams = []
-        self.raw_persons = []
-        self.raw_groups = []
-        self.raw_organizations = []
-        self.raw_submissions = []
-        self.raw_judgements = []
-        self.load_data()
-        self.prep_data()
+        self.contest_info = None
+        self.judgement_type_dict = Store()
+        self.problem_dict = Store()
+        self.groups = Store()
+        self.organizations = Store()
+        self.team_dict = Store(record=Team)
+        self.person_dict = Store()
+        self.members = {}
+        self.submission_dict = Store(record=Submission)
+        # 评测按submission_id保存，重测后只保留当前有效的评测
+        self.judgement_dict = JudgementStore(record=Judgement)
+        # 第一次从url读取event-feed时才创建，读取本地文件或从快照恢复时不需要联网
+        self.fetcher = None
+        self.ranking = None
+        if snapshot != '':
+            # 从快照恢复时跳过下载和预处理，只重新评奖和导出
+            with profiler.phase('load-snapshot'):
+                self.__dict__.update(load_snapshot(snapshot, 'pta'))
+            return
+        self.refresh()
+
+    def refresh(self):
+        # 实体按id原位更新，重新读取event-feed不会产生重复
+        with profiler.phase('load'):
+            self.load_data()
+        with profiler.phase('prep'):
+            self.prep_data()
+
+    def save_snapshot(self, filename):
+        with profiler.phase('save-snapshot'):
+            save_snapshot(filename, 'pta', { field: getattr(self, field) for field in self.SNAPSHOT_FIELDS })
 
     def API(self, method):
-        req_url = self.config['url'] + method
-        print ("[   ] GET %s" % req_url, end='\r')
-        res = requests.get(req_url, auth=HTTPBasicAuth(self.config['username'], self.config['password']), verify=False)
-        print ("[%d] GET %s" % (res.status_code, req_url))
-        with open("eventfeed.json", "w") as f:
-            f.write(res.text)
-        return [json.loads(i) for i in res.text.split('\n') if i != ""]
+        # 连接池在多次刷新之间复用
+        if self.fetcher is None:
+            self.fetcher = Fetcher(self.config)
+        with open("eventfeed.json", "wb") as f:
+            for line in self.fetcher.lines(self.config['url'] + method, cached=True):
+                f.write(line + b'\n')
+                yield line
 
     def load_data(self):
         self.load_event_feed()
@@ -44,127 +76,106 @@ class PTA_school:
         self.load_problems()
         self.load_scoreboard()
 
-    def load_event_feed(self):
+    def event_feed_lines(self):
         if self.config["file"] != "":
-            with open(self.config['file'], "r") as f:
-                res = f.read()
-            tmp = [json.loads(i) for i in res.split('\n') if i != ""]
+            # 本地文件可以是gzip/xz/zstd压缩的
+            with open_input(self.config['file']) as f:
+                yield from f
         else:
-            tmp = self.API("event-feed")
-        for info in tmp:
+            yield from self.API("event-feed")
+
+    def load_event_feed(self):
+        # 逐行解析，按id原位更新或删除，内存只与当前实体数量有关
+        stores = {
+            "judgement-types": self.judgement_type_dict,
+            "problems": self.problem_dict,
+            "teams": self.team_dict,
+            "groups": self.groups,
+            "organizations": self.organizations,
+            "persons": self.person_dict,
+            "submissions": self.submission_dict,
+            "judgements": self.judgement_dict,
+        }
+        ignored = { "state", "languages" }
+        for line in self.event_feed_lines():
+            if line.strip() == b"":
+                continue
+            info = json.loads(line)
             info_type = info["type"]
-            info_data = info["data"]
-            if info_type == "state":
-                pass
-            elif info_type == "contests":
-                self.contest_info = info_data
-            elif info_type == "judgement-types":
-                self.raw_judgement_types.append(info_data)
-            elif info_type == "languages":
-                pass
-            elif info_type == "problems":
-                self.raw_problems.append(info_data)
-            elif info_type == "teams":
-                self.raw_teams.append(info_data)
-            elif info_type == "groups":
-                self.raw_groups.append(info_data)
-            elif info_type == "organizations":
-                self.raw_organizations.append(info_data)
-            elif info_type == "persons":
-                self.raw_persons.append(info_data)
-            elif info_type == "submissions":
-                self.raw_submissions.append(info_data)
-            elif info_type == "judgements":
-                self.raw_judgements.append(info_data)
-            else:
+            if info_type == "contests":
+                self.feed_contest(info["data"])
+            elif info_type not in ignored and not apply_event(stores, info):
                 raise KeyError(f"Unknown type {info_type}")
 
+    def feed_contest(self, data):
+        self.contest_info = data
+
     def load_groups(self):
-        groups = self.raw_groups
+        # groups已在load_event_feed中按id写入
         # func = lambda group : not group['hidden']
-        # groups = list(filter(func, groups))
-        self.groups = {group['id'] : group for group in groups}
+        pass
 
     def load_organizations(self):
-        organizations = self.raw_organizations
-        self.organizations = {organization['id']: organization for organization in organizations}
+        # organizations已在load_event_feed中按id写入
+        pass
 
     def load_teams(self):
-        teams = self.raw_teams
-        group_ids = [group['id'] for group in self.groups.values()]
-        same = lambda x, y: list(set(x) & set(y))
-        func = lambda team: len(same(team['group_ids'], group_ids))
-        # self.teams = list(filter(func, teams))
-        self.teams = teams
-        self.team_dict = {team['id']: team for team in self.teams}
-        for person in self.raw_persons:
-            if "members" not in self.team_dict[person["team_id"]]:
-                self.team_dict[person["team_id"]]["members"] = []
-            self.team_dict[person["team_id"]]["members"].append(person["name"])
-        for key in self.team_dict.keys():
-            self.team_dict[key]["members"] = '、'.join(self.team_dict[key]["members"])
-        self.teams = [value for _, value in self.team_dict.items()]
+        # func = lambda team: not self.groups.keys().isdisjoint(team['group_ids'])
+        self.members = {}
+        for person in self.person_dict.values():
+            self.members.setdefault(person["team_id"], []).append(person["name"])
+        for team_id, team in self.team_dict.items():
+            team.members = '、'.join(self.members.get(team_id, []))
+        self.teams = list(self.team_dict.values())
 
     def load_submissions(self):
-        submissions = self.raw_submissions
-        team_ids = [team['id'] for team in self.teams]
-        func = lambda submission: submission['team_id'] in team_ids
-        self.submissions = list(filter(func, submissions))
+        func = lambda submission: submission.team_id in self.team_dict
+        self.submissions = list(filter(func, self.submission_dict.values()))
 
     def load_judgements(self):
-        judgements = self.raw_judgements
-        submission_ids = [submission['id'] for submission in self.submissions]
-        func = lambda judgement: judgement['submission_id'] in submission_ids
-        self.judgements = list(filter(func, judgements))
+        submission_ids = { submission.id for submission in self.submissions }
+        func = lambda judgement: judgement.submission_id in submission_ids
+        self.judgements = list(filter(func, self.judgement_dict.values()))
 
     def load_judgement_types(self):
-        self.judgement_types = self.raw_judgement_types
+        self.judgement_types = list(self.judgement_type_dict.values())
 
     def load_problems(self):
-        self.problems = self.raw_problems
+        self.problems = list(self.problem_dict.values())
 
     def load_scoreboard(self):
         self.scoreboard = {"rows": []}
 
     def prep_data(self):
+        self.prep_contest_time()
+        self.index = ContestIndex(self.teams, self.judgements)
         self.submission_judgement_type()
         self.scoreboard_rank()
 
+    def prep_contest_time(self):
+        # 比赛常量只解析一次，提交的比赛时间在构造Submission时已转换为秒
+        self.start_time = dtime2timestamp(self.contest_info['start_time'])
+        self.contest_length = ctime2timestamp(self.contest_info['duration'])
+        self.freeze_start = self.contest_length - ctime2timestamp(self.contest_info['scoreboard_freeze_duration'])
+
     def submission_judgement_type(self):
-        id2idx = { submission['id']: idx for idx, submission in enumerate(self.submissions) }
         judgement_types = { judgement_type['id']: judgement_type for judgement_type in self.judgement_types }
-        for judgement in self.judgements:
-            idx = id2idx[judgement['submission_id']]
-            self.submissions[idx]['judgement_type'] = judgement_types[judgement['judgement_type_id']]
         for submission in self.submissions:
-            if "judgement_type" not in submission:
+            judgement = self.index.submission_judgement.get(submission.id)
+            if judgement is not None:
+                submission.judgement_type = judgement_types[judgement.judgement_type_id]
+            else:
                 # not in => internel error, but pta ignore
-                print(f"Warn submission_id:{submission['id']} {submission['problem_id']} has no judgement, considering WA")
-                submission["judgement_type"] = judgement_types["WA"]
+                print(f"Warn submission_id:{submission.id} {submission.problem_id} has no judgement, considering WA")
+                submission.judgement_type = judgement_types["WA"]
 
     def scoreboard_rank(self):
+        scores = team_scores([team.id for team in self.teams], self.submissions, self.contest_info['penalty_time'] * 60)
         for team in self.teams:
-            team_id = team["id"]
-            num_solved, total_time = 0, 0
-            team_submit_func = lambda submission: submission['team_id'] == team_id 
-            team_submissions = list(filter(team_submit_func, self.submissions))
-            max_submission_id, problems = 0, set()
-            penalty = {problem["id"]: 0 for problem in self.problems}
-            for submission in team_submissions:
-                if submission['problem_id'] in problems:
-                    continue
-                if submission["judgement_type"]['solved']:
-                    problems.add(submission['problem_id'])
-                    num_solved += 1
-                    hour, minute, second = map(int, submission['contest_time'].split(":"))
-                    # total_time += (hour * 60 + minute) * 60 + second + penalty[submission["problem_id"]]
-                    total_time += (hour * 60 + minute) * 60 + penalty[submission["problem_id"]] # no seconds
-                    max_submission_id = max(max_submission_id, int(submission['id']))
-                elif submission["judgement_type"]['penalty']:
-                    penalty[submission["problem_id"]] += self.contest_info['penalty_time'] * 60
+            num_solved, total_time, max_submission_id = scores[team.id]
             row = {
                     "rank": 0,
-                    "team_id" : team_id,
+                    "team_id" : team.id,
                     "score": {
                             "num_solved": num_solved,
                             "total_time": total_time,
@@ -173,29 +184,48 @@ class PTA_school:
                         },
                     }
             self.scoreboard["rows"].append(row)
-        self.scoreboard['rows'].sort(key = lambda x: (-x['score']['num_solved'], x['score']['total_time'], x['score']['max_submission_id']))
-        self.scoreboard['rows'][0]['rank'] = 1
-        for idx in range(len(self.scoreboard['rows']) - 1):
-            self.scoreboard['rows'][idx + 1]['rank'] = idx + 2
-            if self.scoreboard['rows'][idx]['score'] == self.scoreboard['rows'][idx + 1]['score']:
-                self.scoreboard['rows'][idx + 1]['rank'] = self.scoreboard['rows'][idx]['rank']
+        # 保留上一次的排名结构，--watch刷新时只移动分数有变化的队伍
+        self.ranking = rank_rows(self.scoreboard['rows'], self.ranking)
 
         with open("board.csv", "w") as f:
             for row in self.scoreboard['rows']:
-                line = f"{self.team_dict[row['team_id']]['name']},{row['score']['num_solved']},{row['score']['total_time'] // 60},{row['rank']}"
+                line = f"{self.team_dict[row['team_id']].name},{row['score']['num_solved']},{row['score']['total_time'] // 60},{row['rank']}"
                 f.write(line + '\n')
     
     def export(self, filename):
-        self.export_XML(filename + '.xml')
-        self.export_result(filename + '.csv')
-
+        # output_format: xml（默认）、json或both，两种格式由同一份resolver_*_formatter数据生成
+        output_format = check_output_format(self.config)
+        compress = self.config.get('compress', '')
+        changed = False
+        if output_format in ('xml', 'both'):
+            with profiler.phase('export-xml'):
+                changed |= self.export_XML(compressed_name(filename + '.xml', compress))
+        if output_format in ('json', 'both'):
+            with profiler.phase('export-feed'):
+                changed |= self.export_feed(compressed_name(filename + '.ndjson', compress))
+        with profiler.phase('export-csv'):
+            changed |= self.export_result(compressed_name(filename + '.csv', compress))
+        return changed
+
+    # 先写临时文件再替换，Resolver不会读到写了一半的文件；内容没有变化时保留原文件，返回是否有变化
     def export_XML(self, filename):
-        with open(filename, 'w', encoding="utf-8") as f:
-           f.write(XML_dump(self.resolver_formatter()))
+        compact = self.config.get('compact_xml', False)
+        if self.config.get('delta_xml', False) and self.config.get('compress', '') == '':
+            # 只重写第一个变化的元素之后的部分
+            return delta_write(filename, XML_segments(self.resolver_formatter(), compact))
+        with AtomicOutput(filename) as output:
+            XML_write(output.file, self.resolver_formatter(), compact)
+        return output.changed
+
+    def export_feed(self, filename):
+        with AtomicOutput(filename) as output:
+            NDJSON_write(output.file, resolver_events(self.resolver_contest_formatter(), self.judgement_types))
+        return output.changed
 
     def export_result(self, filename):
-        with open(filename, 'w', encoding="utf-8") as f:
-           f.write('\n'.join(self.award_list))
+        with AtomicOutput(filename) as output:
+           output.file.write('\n'.join(self.award_list))
+        return output.changed
 
     def resolver_formatter(self):
         return { 'contest': self.resolver_contest_formatter() }
@@ -225,7 +255,7 @@ class PTA_school:
             # 'short-title': self.contest_info['shortname'],
             'length': self.contest_info['duration'],
             'scoreboard-freeze-length': self.contest_info['scoreboard_freeze_duration'],
-            'starttime': dtime2timestamp(self.contest_info['start_time']),
+            'starttime': self.start_time,
             'penalty': self.contest_info['penalty_time'],
         }
 
@@ -244,40 +274,40 @@ class PTA_school:
         } for problem in self.problems ]
 
     def resolver_team_formatter(self):
-        return [{
-            'id': team['id'],
-            'external-id': team['icpc_id'],
-            'name': escape(team['name']),
-            'university': self.organizations[team['organization_id']]['name'],
-            'university-short-name': self.organizations[team['organization_id']]['name'],
-            # 'region': self.groups[team['group_ids'][0]]['name'],
-        } for team in self.teams ]
+        return ({
+            'id': team.id,
+            'external-id': team.icpc_id,
+            'name': team.name,
+            'university': self.organizations[team.organization_id]['name'],
+            'university-short-name': self.organizations[team.organization_id]['name'],
+            # 'region': self.groups[team.group_ids[0]]['name'],
+        } for team in self.teams)
 
     def resolver_run_formatter(self):
         problems = { problem['id']: problem for problem in self.problems }
-        return [{
-            'id': submission['id'],
-            'problem': problems[submission['problem_id']]['ordinal'] + 1,
-            'team': submission['team_id'],
+        return ({
+            'id': submission.id,
+            'problem': problems[submission.problem_id]['ordinal'] + 1,
+            'team': submission.team_id,
             'judged': "true",
-            'result': submission['judgement_type']['id'],
-            'solved': str(submission['judgement_type']['solved']).lower(),
-            'penalty': str(submission['judgement_type']['penalty']).lower(),
-            'time': ctime2timestamp(submission['contest_time'])
-        } for submission in self.submissions ]
+            'result': submission.judgement_type['id'],
+            'solved': str(submission.judgement_type['solved']).lower(),
+            'penalty': str(submission.judgement_type['penalty']).lower(),
+            'time': submission.contest_seconds
+        } for submission in self.submissions)
 
     def resolver_award_formatter(self):
-        return reduce(lambda x, y: x + y, [
-            # self.resolver_award_winner_formatter(),
-            self.resolver_award_top_team_formatter(self.config["ben"]),
-            self.resolver_award_top_team_formatter(self.config["zhuan"]),
-            self.resolver_award_medal_formatter(self.config["ben"]),
-            self.resolver_award_medal_formatter(self.config["zhuan"]),
-            # self.resolver_award_best_girl_formatter(),
-            # self.resolver_award_first_solved_formatter(),
-            # self.resolver_award_last_AC_formatter()
-            # self.resolver_award_first_WA()
-        ], [])
+        # 每次导出重新评奖，同时导出xml和json时获奖名单不重复
+        self.award_list = self.award_list[:1]
+        # yield from self.resolver_award_winner_formatter()
+        yield from self.resolver_award_top_team_formatter(self.config["ben"])
+        yield from self.resolver_award_top_team_formatter(self.config["zhuan"])
+        yield from self.resolver_award_medal_formatter(self.config["ben"])
+        yield from self.resolver_award_medal_formatter(self.config["zhuan"])
+        # yield from self.resolver_award_best_girl_formatter()
+        # yield from self.resolver_award_first_solved_formatter()
+        # yield from self.resolver_award_last_AC_formatter()
+        # yield from self.resolver_award_first_WA()
 
     def award(self, id, citation, team_ids):
         if type(team_ids) != list:
@@ -286,10 +316,10 @@ class PTA_school:
             teams = team_ids
         for team_id in teams:
             team = self.team_dict[team_id]
-            category = self.organizations[team["organization_id"]]["name"]
+            category = self.organizations[team.organization_id]["name"]
             group = self.get_team_group_name(team_id)
-            members = team["members"]
-            self.award_list.append(f'"{team_id}","{team["name"]}","{group}","{category}","{citation}","{members}"')
+            members = team.members
+            self.award_list.append(f'"{team_id}","{team.name}","{group}","{category}","{citation}","{members}"')
         return {
             'id': id,
             'citation': citation,
@@ -298,24 +328,19 @@ class PTA_school:
         }
 
     def get_team_categories_id(self, team_id):
-        return self.team_dict[team_id]["group_ids"]
+        return self.team_dict[team_id].group_ids
 
     def team_in_group(self, team_id, check_groups):
         if check_groups == []:
             return True
-        check_groups = [str(i) for i in check_groups]
-        groups = self.get_team_categories_id(team_id)
-        for group_id in groups:
-            if str(group_id) in check_groups:
-                return True
-        return False
+        return self.index.team_in_groups(team_id, check_groups)
 
     def team_award_occupy(self, team_id):
         return not self.team_in_group(team_id, self.config['no_occupy_award_categories'])
 
     def get_team_group_name(self, team_id):
         group_name = [] 
-        for group_id in self.team_dict[team_id]["group_ids"]:
+        for group_id in self.team_dict[team_id].group_ids:
             group_name.append(self.groups[group_id]["name"])
         return '、'.join(group_name)
 
@@ -323,17 +348,17 @@ class PTA_school:
     #     first_solved, first_solved_award = [ False for _ in range(len(self.problems)) ], []
     #     problem_id2idx = { problem['id']: problem['ordinal'] for problem in self.problems }
     #     for submission in self.submissions:
-    #         if not submission['judgement_type']['solved']:
+    #         if not submission.judgement_type['solved']:
     #             continue
-    #         if not self.team_award_occupy(submission['team_id']): #打星队伍不评奖
+    #         if not self.team_award_occupy(submission.team_id): #打星队伍不评奖
     #             continue
-    #         if ctime2timestamp(submission['contest_time']) >= ctime2timestamp(self.contest_info['duration']) - ctime2timestamp(self.contest_info['scoreboard_freeze_duration']):
+    #         if submission.contest_seconds >= self.freeze_start:
     #             continue
-    #         idx = problem_id2idx[submission['problem_id']]
+    #         idx = problem_id2idx[submission.problem_id]
     #         if first_solved[idx]:
     #             continue
     #         first_solved[idx] = True
-    #         first_solved_award.append(self.award('first-to-solve-%c' % chr(65 + idx), 'First to solve problem %c' % chr(65 + idx), submission['team_id']))
+    #         first_solved_award.append(self.award('first-to-solve-%c' % chr(65 + idx), 'First to solve problem %c' % chr(65 + idx), submission.team_id))
     #     return first_solved_award
 
     def resolver_award_top_team_formatter(self, config):  #WARNING: 排名相同无法一起评
@@ -349,7 +374,7 @@ class PTA_school:
                 break
             if not self.team_in_group(row['team_id'], award_group): 
                 continue
-            school_id = self.team_dict[row["team_id"]]["organization_id"]
+            school_id = self.team_dict[row["team_id"]].organization_id
             if school_id in award_school:
                 continue
             cnt += 1
@@ -404,7 +429,7 @@ class PTA_school:
                 if not self.team_in_group(row['team_id'], config["group"]): 
                     pos += 1
                     continue
-                school_id = self.team_dict[row["team_id"]]["organization_id"]
+                school_id = self.team_dict[row["team_id"]].organization_id
                 award_school.add(school_id)
                 buf.append(row['team_id'])
                 pos += 1
@@ -419,7 +444,7 @@ class PTA_school:
                 if not self.team_in_group(row['team_id'], config["group"]): 
                     pos += 1
                     continue
-                school_id = self.team_dict[row["team_id"]]["organization_id"]
+                school_id = self.team_dict[row["team_id"]].organization_id
                 award_school.add(school_id)
                 buf.append(row['team_id'])
                 pos += 1
@@ -434,7 +459,7 @@ class PTA_school:
                 if not self.team_in_group(row['team_id'], config["group"]): 
                     pos += 1
                     continue
-                school_id = self.team_dict[row["team_id"]]["organization_id"]
+                school_id = self.team_dict[row["team_id"]].organization_id
                 award_school.add(school_id)
                 buf.append(row['team_id'])
                 pos += 1
@@ -444,19 +469,19 @@ class PTA_school:
         return medal_team_award
 
     # def resolver_award_last_AC_formatter(self):
-    #     submissions = list(filter(lambda submission: submission['judgement_type']['id'] == "AC", self.submissions))
+    #     submissions = list(filter(lambda submission: submission.judgement_type['id'] == "AC", self.submissions))
     #     if len(submissions) == 0:
     #         return []
     #     return [
-    #         self.award("last-AC", "Tenacious Award", submissions[-1]['team_id'])
+    #         self.award("last-AC", "Tenacious Award", submissions[-1].team_id)
     #     ]
     #
     # def resolver_award_first_WA(self):
-    #     submissions = list(filter(lambda submission: submission['judgement_type']['id'] == "WA", self.submissions))
+    #     submissions = list(filter(lambda submission: submission.judgement_type['id'] == "WA", self.submissions))
     #     if len(submissions) == 0:
     #         return []
     #     return [
-    #         self.award("first-WA", "First WA", submissions[0]['team_id'])
+    #         self.award("first-WA", "First WA", submissions[0].team_id)
     #     ]
 
     def resolver_finalized_formatter(self):
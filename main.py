@@ -1,20 +1,53 @@
-from argparse import ArgumentParser
-
-from classes.domjudge import DOMjudge
-from classes.pta import PTA_school
+import sys
 
 from utils.argument_parser import argument_parser
-from utils.config_loader import config_loader
-import subprocess
-
-import urllib3
+from utils.config_loader import check_compress, check_output_format, config_loader
+from utils.profiler import profiler
+from utils.sources import source_class
 
 def main():
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
     argument = argument_parser()
+    if argument['profile'] or argument['profile_json'] != '' or argument['cprofile']:
+        profiler.enable(argument['cprofile'])
+    if argument['batch']:
+        from utils.batch import run_batch
+        results = run_batch(argument['batch'], argument['output'], argument['jobs'], argument['offline'])
+        sys.exit(1 if any(result['status'] != 'ok' for result in results) else 0)
     config = config_loader(argument['config'])
-    # PTA_school(config).export(config['xml'])
-    DOMjudge(config).export(config['xml'])
+    if argument['offline']:
+        config['offline'] = True
+    if argument['compress'] is not None:
+        config['compress'] = argument['compress']
+    # 配置错误在拉取数据之前报出，--watch/--serve不会每轮重试
+    check_output_format(config)
+    check_compress(config)
+    # 数据源由--source或配置中的source指定，默认domjudge
+    source = argument['source'] or config.get('source', 'domjudge')
+    contest = source_class(source)(config, argument['from_snapshot'])
+    if argument['save_snapshot'] != '':
+        contest.save_snapshot(argument['save_snapshot'])
+    if argument['cdp'] != '':
+        if not hasattr(contest, 'export_cdp'):
+            sys.exit(f"source {source} does not provide CDP assets")
+        contest.export_cdp(argument['cdp'], argument['cdp_layout'])
+    if argument['serve'] != '':
+        from utils.serve import serve
+        try:
+            serve(contest, config['xml'], argument['serve'], argument['watch'] or 10)
+        except KeyboardInterrupt:
+            pass
+    elif argument['watch'] > 0:
+        from utils.watch import watch
+        try:
+            watch(contest, config['xml'], argument['watch'])
+        except KeyboardInterrupt:
+            pass
+    else:
+        contest.export(config['xml'])
+    if profiler.enabled:
+        print (profiler.report())
+    if argument['profile_json'] != '':
+        profiler.dump(argument['profile_json'])
 
 if __name__ == '__main__':
     main()
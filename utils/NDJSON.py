@@ -0,0 +1,120 @@
+import json
+
+from utils.utils import ctime2timestamp, timestamp2ctime, timestamp2dtime
+
+def as_list(value):
+    return value if isinstance(value, list) else [value]
+
+def resolver_events(contest, judgement_types=()):
+    '''
+    把resolver_contest_formatter的数据转换为CLICS event-feed中的对象::
+
+        ('contests', id, data), ('judgement-types', id, data), ...
+
+    judgement_types用于补充判题结果的solved/penalty，xml中没有这两项
+    '''
+    judgement_types = { judgement_type['id']: judgement_type for judgement_type in judgement_types }
+    info = contest['info']
+    start = info['starttime']
+    length = ctime2timestamp(info['length'])
+    freeze = ctime2timestamp(info['scoreboard-freeze-length'])
+    yield 'contests', info['contest-id'], {
+        'id': info['contest-id'],
+        'name': info['title'],
+        'formal_name': info['title'],
+        'shortname': info.get('short-title', info['title']),
+        'start_time': timestamp2dtime(start),
+        'duration': info['length'],
+        'scoreboard_freeze_duration': info['scoreboard-freeze-length'],
+        'penalty_time': info['penalty'],
+    }
+    for judgement in contest['judgement']:
+        judgement_type = judgement_types.get(judgement['acronym'], {})
+        yield 'judgement-types', judgement['acronym'], {
+            'id': judgement['acronym'],
+            'name': judgement_type.get('name', judgement['acronym']),
+            'penalty': judgement_type.get('penalty', True),
+            'solved': judgement_type.get('solved', False),
+        }
+    for problem in contest['problem']:
+        yield 'problems', str(problem['id']), {
+            'id': str(problem['id']),
+            'label': problem['label'],
+            'name': problem['name'],
+            'ordinal': problem['id'] - 1,
+        }
+    group_ids = {}
+    for group in contest['region']:
+        group_ids[group['name']] = str(group['external-id'])
+        yield 'groups', group_ids[group['name']], { 'id': group_ids[group['name']], 'name': group['name'] }
+    # 队伍中只有学校名称，按出现顺序给学校编号，需要先输出学校再输出队伍
+    teams = list(contest['team'])
+    organization_ids = {}
+    for team in teams:
+        if team['university'] not in organization_ids:
+            organization_ids[team['university']] = str(len(organization_ids) + 1)
+            yield 'organizations', organization_ids[team['university']], {
+                'id': organization_ids[team['university']],
+                'name': team['university-short-name'],
+                'formal_name': team['university'],
+            }
+    for team in teams:
+        yield 'teams', str(team['id']), {
+            'id': str(team['id']),
+            'icpc_id': team['external-id'],
+            'name': team['name'],
+            'organization_id': organization_ids[team['university']],
+            'group_ids': [group_ids[team['region']]] if team.get('region') in group_ids else [],
+        }
+    for run in contest['run']:
+        contest_time = timestamp2ctime(run['time'])
+        time = timestamp2dtime(start + run['time'])
+        yield 'submissions', str(run['id']), {
+            'id': str(run['id']),
+            'team_id': str(run['team']),
+            'problem_id': str(run['problem']),
+            'time': time,
+            'contest_time': contest_time,
+        }
+        if 'result' not in run:
+            # 评测中的提交只有submission事件
+            continue
+        yield 'judgements', str(run['id']), {
+            'id': str(run['id']),
+            'submission_id': str(run['id']),
+            'judgement_type_id': run['result'],
+            'start_time': time,
+            'start_contest_time': contest_time,
+            'end_time': time,
+            'end_contest_time': contest_time,
+        }
+    for award in contest['award']:
+        yield 'awards', award['id'], {
+            'id': award['id'],
+            'citation': award['citation'],
+            'team_ids': [str(team_id) for team_id in as_list(award['teamId'])],
+        }
+    yield 'state', None, {
+        'started': timestamp2dtime(start),
+        'frozen': timestamp2dtime(start + length - freeze),
+        'ended': timestamp2dtime(start + length),
+        'thawed': timestamp2dtime(start + length),
+        'finalized': timestamp2dtime(start + length),
+        'end_of_updates': timestamp2dtime(start + length),
+    }
+
+def NDJSON_iter(events):
+    # CLICS 2022格式：每行一个事件，token递增
+    for token, (feed_type, id, data) in enumerate(events, 1):
+        event = { 'type': feed_type, 'id': id, 'data': data, 'token': str(token) }
+        yield json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+def NDJSON_write(f, events, buffer_size=1 << 16):
+    buf, size = [], 0
+    for line in NDJSON_iter(events):
+        buf.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            f.write(''.join(buf))
+            buf, size = [], 0
+    f.write(''.join(buf))
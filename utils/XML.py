@@ -1,17 +1,74 @@
+from html import escape
+
 def indent(x):
     return''.join(["  " for i in range(x)])
 
-def XML_dump(body, ind=0):
-    lines = []
+def is_sequence(value):
+    # list或生成器都视为重复的同名元素
+    return not isinstance(value, (str, bytes, dict)) and hasattr(value, '__iter__')
+
+def XML_lines(body, ind=0, compact=False):
     for key in body:
-        if type(body[key]) == type(list()):
-            for item in body[key]:
-                lines.append(XML_dump({key: item}, ind + 1))
+        value = body[key]
+        if is_sequence(value):
+            for item in value:
+                yield from XML_lines({key: item}, ind + 1, compact)
             continue
-        lines.append("%s<%s>" % (indent(ind), key))
-        if type(body[key]) == type(dict()):
-            lines.append(XML_dump(body[key], ind + 1))
+        pad = '' if compact else indent(ind)
+        if isinstance(value, dict):
+            yield "%s<%s>" % (pad, key)
+            empty = True
+            for line in XML_lines(value, ind + 1, compact):
+                empty = False
+                yield line
+            if empty and not compact:
+                yield ""
+            yield "%s</%s>" % (pad, key)
+        elif compact:
+            yield "<%s>%s</%s>" % (key, escape(str(value), quote=False), key)
         else:
-            lines.append("%s%s" % (indent(ind + 1), body[key]))
-        lines.append("%s</%s>" % (indent(ind), key))
-    return '\n'.join(lines)
+            yield "%s<%s>" % (pad, key)
+            yield "%s%s" % (indent(ind + 1), escape(str(value), quote=False))
+            yield "%s</%s>" % (pad, key)
+
+def XML_iter(body, compact=False):
+    if compact:
+        yield from XML_lines(body, 0, True)
+        return
+    first = True
+    for line in XML_lines(body):
+        yield line if first else '\n' + line
+        first = False
+
+def XML_segments(body, compact=False):
+    '''
+    按根元素的子元素分段返回与XML_iter相同的文本::
+
+        <contest>、<info>...</info>、<run>...</run>、...、</contest>
+
+    拼接后与XML_dump(body, compact)完全相同，用于按元素比较两次导出的差异
+    '''
+    sep = '' if compact else '\n'
+    for key in body:
+        yield "<%s>" % key
+        for child in body[key]:
+            value = body[key][child]
+            if is_sequence(value):
+                for item in value:
+                    yield sep + sep.join(XML_lines({child: item}, 2, compact))
+            else:
+                yield sep + sep.join(XML_lines({child: value}, 1, compact))
+        yield "%s</%s>" % (sep, key)
+
+def XML_write(f, body, compact=False, buffer_size=1 << 16):
+    buf, size = [], 0
+    for chunk in XML_iter(body, compact):
+        buf.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            f.write(''.join(buf))
+            buf, size = [], 0
+    f.write(''.join(buf))
+
+def XML_dump(body, compact=False):
+    return ''.join(XML_iter(body, compact))
@@ -3,4 +3,19 @@ from argparse import ArgumentParser
 def argument_parser():
     parser = ArgumentParser()
     parser.add_argument('--config', help='config filename', default='config.json')
+    parser.add_argument('--source', help='contest source (domjudge, pta); overrides "source" in config', default=None)
+    parser.add_argument('--offline', help='rebuild from cached responses only', action='store_true')
+    parser.add_argument('--profile', help='print per-phase timing, memory and request telemetry', action='store_true')
+    parser.add_argument('--profile-json', help='also write the profile report to this JSON file', default='')
+    parser.add_argument('--cprofile', help='run cProfile on a phase (load, prep, export-xml, export-csv)', action='append', default=[])
+    parser.add_argument('--compress', help='compress exported files (gzip, xz, zstd)', choices=['gzip', 'xz', 'zstd'])
+    parser.add_argument('--save-snapshot', help='save the loaded contest state to this file', default='')
+    parser.add_argument('--from-snapshot', help='skip loading and rebuild awards/exports from this snapshot', default='')
+    parser.add_argument('--watch', help='keep running and re-export every WATCH seconds', type=float, default=0)
+    parser.add_argument('--serve', help='serve the exports over HTTP on [HOST:]PORT, refreshing every WATCH seconds (default 10)', default='')
+    parser.add_argument('--cdp', help='download team photos and organization logos into this CDP directory', default='')
+    parser.add_argument('--cdp-layout', help='CDP layout of the resolver version', choices=['2.1', '2.4'], default='2.4')
+    parser.add_argument('--batch', help='run every config file (or every *.json in a directory) in a process pool', action='append', default=[])
+    parser.add_argument('--jobs', help='number of batch worker processes (default: CPU count)', type=int, default=None)
+    parser.add_argument('--output', help='batch output directory, one sub-directory per config', default='batch')
     return vars(parser.parse_args())
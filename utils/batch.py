@@ -0,0 +1,83 @@
+import contextlib
+import glob
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.config_loader import check_compress, check_output_format, config_loader
+from utils.profiler import peak_rss
+from utils.sources import source_class
+
+# 这些配置项是路径，相对路径按配置文件所在目录解析，任务切换到自己的输出目录前转成绝对路径
+PATH_KEYS = ['file', 'cache_dir', 'event_feed']
+
+def collect_configs(paths):
+    filenames = []
+    for path in paths:
+        if os.path.isdir(path):
+            filenames.extend(sorted(glob.glob(os.path.join(path, '*.json'))))
+        else:
+            filenames.append(path)
+    return filenames
+
+def plan_jobs(filenames, output, offline=False):
+    jobs, names = [], set()
+    for filename in filenames:
+        name = base = os.path.splitext(os.path.basename(filename))[0]
+        suffix = 1
+        while name in names:
+            suffix += 1
+            name = '%s-%d' % (base, suffix)
+        names.add(name)
+        jobs.append((name, os.path.abspath(filename), os.path.abspath(os.path.join(output, name)), offline))
+    return jobs
+
+def run_job(job):
+    '''
+    在独立进程中运行一个比赛，输出和日志都写到该任务的目录下
+    '''
+    name, filename, directory, offline = job
+    start = time.perf_counter()
+    result = { 'name': name, 'config': filename, 'directory': directory, 'status': 'ok', 'error': '' }
+    try:
+        config = config_loader(filename)
+        for key in PATH_KEYS:
+            if config.get(key, '') != '':
+                config[key] = os.path.join(os.path.dirname(filename), config[key])
+        if offline:
+            config['offline'] = True
+        # 配置错误在拉取数据之前报出
+        check_output_format(config)
+        check_compress(config)
+        os.makedirs(directory, exist_ok=True)
+        os.chdir(directory)
+        with open('log.txt', 'w', encoding="utf-8") as log, contextlib.redirect_stdout(log):
+            try:
+                source_class(config.get('source', 'domjudge'))(config).export(config['xml'])
+            except Exception:
+                traceback.print_exc(file=log)
+                raise
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = '%s: %s' % (type(e).__name__, e)
+    result['wall'] = time.perf_counter() - start
+    result['peak_rss'] = peak_rss()
+    return result
+
+def run_batch(paths, output='batch', jobs=None, offline=False):
+    filenames = collect_configs(paths)
+    # max_tasks_per_child=1（python 3.11+）：每个任务一个新进程，全局状态和内存互不影响；
+    # 更早的版本进程会被复用，run_job每次重新读取配置和切换目录，峰值内存为该进程运行过的任务中的最大值
+    options = { 'max_tasks_per_child': 1 } if sys.version_info >= (3, 11) else {}
+    with ProcessPoolExecutor(max_workers=jobs, **options) as executor:
+        results = list(executor.map(run_job, plan_jobs(filenames, output, offline)))
+    print ("%-24s %-7s %10s %14s  %s" % ('job', 'status', 'wall(s)', 'peak RSS(MB)', 'output'))
+    for result in results:
+        print ("%-24s %-7s %10.3f %14.1f  %s" % (result['name'], result['status'], result['wall'], result['peak_rss'] / 2 ** 20, result['directory']))
+    failed = [result for result in results if result['status'] != 'ok']
+    for result in failed:
+        print ("%s (%s): %s" % (result['name'], result['config'], result['error']))
+    print ("%d jobs, %d failed" % (len(results), len(failed)))
+    return results
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import os
+
+class ResponseCache:
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest())
+
+    def meta(self, url):
+        try:
+            with open(self.path(url) + '.json', 'r', encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def headers(self, url):
+        # 条件请求头，服务端未变化时返回304
+        meta, headers = self.meta(url), {}
+        if meta is None:
+            return headers
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def body_path(self, url):
+        return self.path(url) + '.body'
+
+    def read(self, url):
+        with open(self.body_path(url), 'rb') as f:
+            return f.read()
+
+    def lines(self, url):
+        with open(self.body_path(url), 'rb') as f:
+            for line in f:
+                yield line.rstrip(b'\r\n')
+
+    def chunks(self, url, size=1 << 16):
+        with open(self.body_path(url), 'rb') as f:
+            yield from iter(lambda: f.read(size), b'')
+
+    def begin(self, url):
+        # 先写入临时文件，commit时再替换，中途失败不会破坏旧缓存
+        return open(self.body_path(url) + '.tmp', 'wb')
+
+    def write(self, url, content, headers):
+        with self.begin(url) as f:
+            f.write(content)
+        self.commit(url, headers)
+
+    def commit(self, url, headers):
+        path = self.path(url)
+        os.replace(path + '.body.tmp', path + '.body')
+        meta = { 'url': url, 'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified') }
+        with open(path + '.json.tmp', 'w', encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(path + '.json.tmp', path + '.json')
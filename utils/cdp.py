@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import as_completed
+
+# 各版本Resolver的CDP目录中图片的位置，team为队伍的Team记录
+LAYOUTS = {
+    '2.4': {
+        'photo': lambda team: 'teams/%s/photo.png' % team.id,
+        'logo': lambda team: 'organizations/%s/logo.png' % team.id,
+        'contest': ['contest/logo.png'],
+    },
+    '2.1': {
+        'photo': lambda team: 'images/team/%s.jpg' % (team.icpc_id or team.id),
+        'logo': lambda team: 'images/logo/%s.png' % (team.icpc_id or team.id),
+        'contest': [],
+    },
+}
+
+MANIFEST = '.assets.json'
+
+def asset_jobs(teams, layout):
+    '''
+    返回{接口: [CDP目录下的路径, ...]}，同一学校的logo只请求一次，放到该学校每个队伍的目录下
+    '''
+    paths = LAYOUTS[layout]
+    jobs = {}
+    for team in teams:
+        jobs.setdefault('/teams/%s/photo' % team.id, []).append(paths['photo'](team))
+        if team.organization_id is not None:
+            jobs.setdefault('/organizations/%s/logo' % team.organization_id, []).append(paths['logo'](team))
+    if paths['contest']:
+        jobs['/banner'] = list(paths['contest'])
+    return jobs
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(content)
+    os.replace(path + '.tmp', path)
+
+def link_file(source, path):
+    # 同一个logo用硬链接，不支持硬链接时复制
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.lexists(path):
+        os.remove(path)
+    try:
+        os.link(source, path)
+    except OSError:
+        shutil.copyfile(source, path)
+
+def fetch_assets(fetcher, base_url, teams, directory, layout='2.4'):
+    '''
+    并发下载队伍照片、学校logo和比赛banner到CDP目录
+
+    目录下的.assets.json记录每个文件内容的sha256，内容没有变化的文件不重写；
+    配合cache_dir时没有变化的图片服务端直接返回304。
+    '''
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown CDP layout {layout}, expected one of {', '.join(LAYOUTS)}")
+    manifest_path = os.path.join(directory, MANIFEST)
+    try:
+        with open(manifest_path, 'r', encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+    jobs = asset_jobs(teams, layout)
+    futures = { fetcher.executor.submit(fetcher.download, base_url + method): method for method in jobs }
+    stats = { 'written': 0, 'unchanged': 0, 'missing': 0 }
+    for future in as_completed(futures):
+        content = future.result()
+        targets = jobs[futures[future]]
+        if content is None:
+            stats['missing'] += len(targets)
+            continue
+        digest = hashlib.sha256(content).hexdigest()
+        source = None
+        for target in targets:
+            path = os.path.join(directory, target)
+            if manifest.get(target) == digest and os.path.exists(path):
+                stats['unchanged'] += 1
+                source = source or path
+                continue
+            if source is None:
+                write_file(path, content)
+                source = path
+            else:
+                link_file(source, path)
+            manifest[target] = digest
+            stats['written'] += 1
+    os.makedirs(directory, exist_ok=True)
+    with open(manifest_path + '.tmp', 'w', encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    print ("[   ] CDP assets: %d written, %d unchanged, %d missing" % (stats['written'], stats['unchanged'], stats['missing']))
+    return stats
@@ -0,0 +1,102 @@
+import filecmp
+import gzip
+import io
+import lzma
+import os
+
+# 压缩格式对应的扩展名，zstd需要额外安装zstandard
+SUFFIXES = {
+    'gzip': '.gz',
+    'xz': '.xz',
+    'zstd': '.zst',
+}
+
+def zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd compression requires the zstandard package (pip install zstandard)")
+    return zstandard
+
+def compressed_name(filename, compress=''):
+    if compress == '':
+        return filename
+    if compress not in SUFFIXES:
+        raise ValueError(f"Unknown compression {compress}, expected one of {', '.join(SUFFIXES)}")
+    return filename + SUFFIXES[compress]
+
+def open_output(filename, fileobj, encoding="utf-8"):
+    '''
+    按filename的扩展名选择压缩格式，返回写入fileobj（二进制文件对象）的文本写入对象，写入的内容边写边压缩::
+
+        events.xml     -> 不压缩
+        events.xml.gz  -> gzip
+        events.xml.xz  -> xz
+        events.xml.zst -> zstd
+
+    关闭返回的对象后fileobj可能仍然打开，由调用方关闭
+    '''
+    if filename.endswith('.gz'):
+        # gzip头中记录filename（而不是fileobj的临时文件名），mtime固定为0，相同内容压缩后的文件也相同
+        return io.TextIOWrapper(gzip.GzipFile(os.path.basename(filename), 'wb', 6, fileobj, mtime=0), encoding=encoding)
+    if filename.endswith('.xz'):
+        return lzma.open(fileobj, 'wt', encoding=encoding)
+    if filename.endswith('.zst'):
+        writer = zstandard().ZstdCompressor().stream_writer(fileobj, closefd=False)
+        return io.TextIOWrapper(writer, encoding=encoding)
+    return io.TextIOWrapper(fileobj, encoding=encoding)
+
+def open_input(filename):
+    '''
+    按文件头识别压缩格式，返回二进制读取对象，可逐行迭代
+    '''
+    with open(filename, 'rb') as f:
+        magic = f.read(6)
+    if magic.startswith(b'\x1f\x8b'):
+        return gzip.open(filename, 'rb')
+    if magic.startswith(b'\xfd7zXZ\x00'):
+        return lzma.open(filename, 'rb')
+    if magic.startswith(b'\x28\xb5\x2f\xfd'):
+        reader = zstandard().ZstdDecompressor().stream_reader(open(filename, 'rb'), closefd=True)
+        return io.BufferedReader(reader)
+    return open(filename, 'rb')
+
+class AtomicOutput:
+    '''
+    写入同目录下的临时文件，成功后替换目标文件；内容与原文件相同时不替换::
+
+        with AtomicOutput('events.xml') as output:
+            output.file.write(...)
+        output.changed
+    '''
+
+    def __init__(self, filename):
+        self.filename = filename
+        # 临时文件保留原扩展名，压缩格式不变
+        self.tmp = os.path.join(os.path.dirname(filename), '.tmp-' + os.path.basename(filename))
+        self.raw = None
+        self.file = None
+        self.changed = False
+
+    def __enter__(self):
+        self.raw = open(self.tmp, 'wb')
+        try:
+            self.file = open_output(self.filename, self.raw)
+        except BaseException:
+            self.raw.close()
+            os.remove(self.tmp)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        self.raw.close()
+        if exc_type is not None:
+            os.remove(self.tmp)
+            return False
+        if os.path.exists(self.filename) and filecmp.cmp(self.tmp, self.filename, shallow=False):
+            os.remove(self.tmp)
+        else:
+            os.replace(self.tmp, self.filename)
+            self.changed = True
+        return False
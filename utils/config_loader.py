@@ -1,5 +1,25 @@
 import json
 
+from utils.compression import SUFFIXES, zstandard
+
 def config_loader(filename):
     with open(filename, 'r') as f:
         return json.load(f)
+
+# output_format: xml（默认）、json（CLICS event feed）或both
+OUTPUT_FORMATS = ('xml', 'json', 'both')
+
+def check_output_format(config):
+    value = config.get('output_format', 'xml')
+    if value not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format {value}, expected one of {', '.join(OUTPUT_FORMATS)}")
+    return value
+
+def check_compress(config):
+    # compress: 空（默认）、gzip、xz或zstd；zstd需要的zstandard也在这里检查
+    value = config.get('compress', '')
+    if value != '' and value not in SUFFIXES:
+        raise ValueError(f"Unknown compression {value}, expected one of {', '.join(SUFFIXES)}")
+    if value == 'zstd':
+        zstandard()
+    return value
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+
+def index_name(filename):
+    return os.path.join(os.path.dirname(filename), '.' + os.path.basename(filename) + '.idx')
+
+def digest(data):
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def load_index(filename):
+    '''
+    读取filename的分段索引，索引与文件当前的大小和修改时间不一致（如文件被其他程序改过）时返回None
+    '''
+    try:
+        with open(index_name(filename), 'r', encoding="utf-8") as f:
+            index = json.load(f)
+        stat = os.stat(filename)
+    except (OSError, ValueError):
+        return None
+    if index.get('size') != stat.st_size or index.get('mtime') != stat.st_mtime_ns:
+        return None
+    return index
+
+def copy_prefix(filename, target, length):
+    '''
+    把filename的前length字节复制到刚打开的target，Linux上用copy_file_range在内核中复制
+    '''
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    with open(filename, 'rb', buffering=0) as source:
+        fd, remaining = target.fileno(), length
+        while remaining > 0:
+            if copy_file_range is not None:
+                try:
+                    count = copy_file_range(source.fileno(), fd, remaining)
+                except OSError:
+                    copy_file_range = None
+                    continue
+            else:
+                count = os.write(fd, source.read(min(remaining, 1 << 20)))
+            if count == 0:
+                raise RuntimeError("%s changed while copying" % filename)
+            remaining -= count
+    target.seek(length)
+
+def open_tmp(filename, tmp, prefix):
+    output = open(tmp, 'wb')
+    if prefix:
+        copy_prefix(filename, output, prefix)
+    return output
+
+def delta_write(filename, segments):
+    '''
+    按段增量导出不压缩的文件，返回内容是否有变化::
+
+        delta_write('events.xml', XML_segments(body))
+
+    同目录下的.<文件名>.idx记录每段的字节长度和哈希，从第一个变化的段开始重写，
+    之前没有变化的部分直接从原文件复制。仍然先写临时文件再替换，读取方不会读到写了一半的文件。
+    '''
+    index = load_index(filename)
+    old = index['segments'] if index is not None else []
+    tmp = os.path.join(os.path.dirname(filename), '.tmp-' + os.path.basename(filename))
+    segments = iter(segments)
+    lengths, hashes, prefix, output = [], [], 0, None
+    try:
+        for segment in segments:
+            data = segment.encode('utf-8')
+            lengths.append(len(data))
+            hashes.append(digest(data))
+            if output is None:
+                idx = len(hashes) - 1
+                if idx < len(old) and old[idx] == [lengths[-1], hashes[-1]]:
+                    prefix += lengths[-1]
+                    continue
+                output = open_tmp(filename, tmp, prefix)
+            output.write(data)
+        if output is None:
+            if index is not None and len(old) == len(hashes):
+                return False
+            # 新内容是原文件的前缀，截断后替换
+            output = open_tmp(filename, tmp, prefix)
+        output.close()
+    except BaseException:
+        if output is not None:
+            output.close()
+            os.remove(tmp)
+        raise
+    os.replace(tmp, filename)
+    stat = os.stat(filename)
+    index = {
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'segments': [[length, hash] for length, hash in zip(lengths, hashes)],
+    }
+    with open(index_name(filename) + '.tmp', 'w', encoding="utf-8") as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(index_name(filename) + '.tmp', index_name(filename))
+    return True
@@ -0,0 +1,79 @@
+import json
+import os
+
+from utils.store import JudgementStore, Store, apply_event
+
+# REST接口与event-feed中事件类型的对应关系
+FEED_TYPES = {
+    '/': 'contests',
+    '/groups': 'groups',
+    '/organizations': 'organizations',
+    '/teams': 'teams',
+    '/submissions': 'submissions',
+    '/judgements': 'judgements',
+    '/judgement-types': 'judgement-types',
+    '/problems': 'problems',
+}
+
+class EventFeed:
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.token = None
+        self.token_key = 'id'
+        self.state = self.stores({})
+        if os.path.exists(filename):
+            self.load()
+
+    def stores(self, state):
+        # 评测按提交保存，只保留当前有效的一个
+        return { feed_type: (JudgementStore if feed_type == 'judgements' else Store)(state.get(feed_type, {})) for feed_type in FEED_TYPES.values() }
+
+    def load(self):
+        with open(self.filename, 'r', encoding="utf-8") as f:
+            saved = json.load(f)
+        self.token = saved['token']
+        self.token_key = saved['token_key']
+        self.state = self.stores(saved['state'])
+
+    def save(self):
+        tmp = self.filename + '.tmp'
+        with open(tmp, 'w', encoding="utf-8") as f:
+            json.dump({ 'token': self.token, 'token_key': self.token_key, 'state': self.state }, f, ensure_ascii=False)
+        os.replace(tmp, self.filename)
+
+    def url(self, base, stream=False):
+        url = base + '/event-feed?stream=' + ('true' if stream else 'false')
+        if self.token is not None:
+            url += '&since_%s=%s' % (self.token_key, self.token)
+        return url
+
+    def follow(self, fetcher, base):
+        count = 0
+        for line in fetcher.lines(self.url(base)):
+            self.apply(json.loads(line))
+            count += 1
+        print ("[   ] event-feed: %d new events, last %s %s" % (count, self.token_key, self.token))
+        return count
+
+    def apply(self, event):
+        # DOMjudge 8+ 使用CLICS 2022格式的token，旧版本使用事件id
+        if 'token' in event:
+            self.token, self.token_key = event['token'], 'token'
+        elif 'id' in event and 'op' in event:
+            self.token = event['id']
+        if event['type'] == 'contests':
+            # 比赛只有一个，不按id累积
+            if event.get('data') is not None:
+                self.state['contests'].replace([event['data']])
+            return
+        apply_event(self.state, event)
+
+    def has(self, method):
+        return method in FEED_TYPES
+
+    def collection(self, method):
+        store = self.state[FEED_TYPES[method]]
+        if method == '/':
+            return next(iter(store.values()))
+        return list(store.values())
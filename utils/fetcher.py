@@ -0,0 +1,146 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cache import ResponseCache
+from utils.json_stream import iter_array
+from utils.profiler import profiler
+
+class Fetcher:
+
+    def __init__(self, config):
+        self.parallel = max(1, int(config.get('parallel', 4)))
+        self.offline = config.get('offline', False)
+        self.cache = ResponseCache(config['cache_dir']) if config.get('cache_dir', '') != '' else None
+        if self.offline and self.cache is None:
+            raise ValueError("offline mode requires 'cache_dir' in config")
+        self.session = None if self.offline else self.connect(config)
+        self.executor = ThreadPoolExecutor(max_workers=self.parallel)
+
+    def connect(self, config):
+        # requests只在需要联网时导入，离线和快照模式启动更快
+        import requests
+        import urllib3
+        from requests.adapters import HTTPAdapter
+        from requests.auth import HTTPBasicAuth
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        session = requests.Session()
+        session.auth = HTTPBasicAuth(config['username'], config['password'])
+        session.verify = False
+        # 每个worker一个长连接，避免每次请求重新握手
+        adapter = HTTPAdapter(pool_connections=self.parallel, pool_maxsize=self.parallel)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def fetch(self, url):
+        '''
+        返回(状态码, 内容)；使用缓存时304返回缓存的内容，离线时返回(200, 缓存的内容)
+        '''
+        if self.offline:
+            if self.cache.meta(url) is None:
+                raise FileNotFoundError("no cached response for %s" % url)
+            print ("[OFF] GET %s" % url)
+            return 200, self.cache.read(url)
+        headers = self.cache.headers(url) if self.cache is not None else {}
+        start = time.perf_counter()
+        res = self.session.get(url, headers=headers)
+        profiler.request(url, res.status_code, time.perf_counter() - start, len(res.content))
+        print ("[%d] GET %s" % (res.status_code, url))
+        if self.cache is None:
+            return res.status_code, res.content
+        if res.status_code == 304:
+            return res.status_code, self.cache.read(url)
+        if res.status_code == 200:
+            self.cache.write(url, res.content, res.headers)
+        return res.status_code, res.content
+
+    def get(self, url):
+        return self.fetch(url)[1]
+
+    def download(self, url):
+        # 图片等文件，服务端没有（离线时为没有缓存）时返回None
+        if self.offline and self.cache.meta(url) is None:
+            return None
+        status, content = self.fetch(url)
+        if status == 404:
+            return None
+        if status not in (200, 304):
+            raise RuntimeError("GET %s returned %d" % (url, status))
+        return content
+
+    def get_json(self, url):
+        return json.loads(self.get(url))
+
+    def lines(self, url, cached=False):
+        cache = self.cache if cached else None
+        if self.offline:
+            # 离线模式下只回放缓存，未缓存的增量event-feed视为没有新事件
+            if cache is None:
+                return
+            if cache.meta(url) is None:
+                raise FileNotFoundError("no cached response for %s" % url)
+            print ("[OFF] GET %s" % url)
+            yield from (line for line in cache.lines(url) if line)
+            return
+        headers = cache.headers(url) if cache is not None else {}
+        # 流式读取时耗时包含调用方处理每一行的时间
+        start, size = time.perf_counter(), 0
+        with self.session.get(url, headers=headers, stream=True) as res:
+            print ("[%d] GET %s" % (res.status_code, url))
+            if cache is not None and res.status_code == 304:
+                profiler.request(url, res.status_code, time.perf_counter() - start, 0)
+                yield from (line for line in cache.lines(url) if line)
+                return
+            res.raise_for_status()
+            body = cache.begin(url) if cache is not None else None
+            for line in res.iter_lines():
+                size += len(line) + 1
+                if body is not None:
+                    body.write(line + b'\n')
+                # 空行为event-feed的心跳
+                if line:
+                    yield line
+            if body is not None:
+                body.close()
+                cache.commit(url, res.headers)
+            profiler.request(url, res.status_code, time.perf_counter() - start, size)
+
+    def chunks(self, url, size=1 << 16):
+        if self.offline:
+            if self.cache.meta(url) is None:
+                raise FileNotFoundError("no cached response for %s" % url)
+            print ("[OFF] GET %s" % url)
+            yield from self.cache.chunks(url, size)
+            return
+        headers = self.cache.headers(url) if self.cache is not None else {}
+        start, received = time.perf_counter(), 0
+        with self.session.get(url, headers=headers, stream=True) as res:
+            print ("[%d] GET %s" % (res.status_code, url))
+            if self.cache is not None and res.status_code == 304:
+                profiler.request(url, res.status_code, time.perf_counter() - start, 0)
+                yield from self.cache.chunks(url, size)
+                return
+            res.raise_for_status()
+            body = self.cache.begin(url) if self.cache is not None else None
+            for chunk in res.iter_content(size):
+                received += len(chunk)
+                if body is not None:
+                    body.write(chunk)
+                yield chunk
+            if body is not None:
+                body.close()
+                self.cache.commit(url, res.headers)
+            profiler.request(url, res.status_code, time.perf_counter() - start, received)
+
+    def items(self, url):
+        # 边下载边解析JSON数组，逐个返回元素
+        return iter_array(self.chunks(url))
+
+    def submit(self, url):
+        return self.executor.submit(self.get_json, url)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        if self.session is not None:
+            self.session.close()
@@ -0,0 +1,18 @@
+from collections import defaultdict
+
+class ContestIndex:
+
+    def __init__(self, teams, judgements):
+        # group id统一为str，与config中的组别比较
+        self.group_teams = defaultdict(set)
+        for team in teams:
+            for group_id in team.group_ids:
+                self.group_teams[str(group_id)].add(team.id)
+        # 同一提交有多个评测时后出现的生效
+        self.submission_judgement = { judgement.submission_id: judgement for judgement in judgements }
+
+    def team_in_groups(self, team_id, group_ids):
+        for group_id in group_ids:
+            if team_id in self.group_teams.get(str(group_id), ()):
+                return True
+        return False
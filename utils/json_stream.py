@@ -0,0 +1,64 @@
+import codecs
+import json
+
+WHITESPACE = ' \t\n\r'
+
+def iter_array(chunks):
+    '''
+    逐个解析顶层JSON数组中的元素，chunks为bytes块的迭代器::
+
+        for item in iter_array(res.iter_content(1 << 16)):
+            ...
+
+    任何时刻只保留未解析完的一段文本和当前元素，不需要先得到整个响应
+    '''
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buf, pos, done = '', 0, False
+    # 下一个应出现的内容：start为'['，first为第一个元素或']'，item为元素，sep为','或']'
+    expect = 'start'
+    chunks = iter(chunks)
+    while True:
+        while pos < len(buf) and buf[pos] in WHITESPACE:
+            pos += 1
+        if pos < len(buf):
+            if expect == 'start':
+                if buf[pos] != '[':
+                    raise ValueError("expected a JSON array, got %r" % buf[pos:pos + 20])
+                expect = 'first'
+                pos += 1
+                continue
+            if expect == 'sep' and buf[pos] not in ',]':
+                raise ValueError("expected ',' or ']' in JSON array, got %r" % buf[pos:pos + 20])
+            if buf[pos] == ']' and expect != 'item':
+                # 读完剩余数据，让chunks的提供方（如响应缓存）正常结束
+                rest = buf[pos + 1:] + ''.join(text.decode(chunk) for chunk in chunks)
+                if rest.strip(WHITESPACE) != '':
+                    raise ValueError("unexpected data after JSON array")
+                return
+            if buf[pos] == ',' and expect == 'sep':
+                expect = 'item'
+                pos += 1
+                continue
+            if buf[pos] in ',]':
+                raise ValueError("unexpected %r in JSON array" % buf[pos])
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                end = None
+            # 元素后面不是分隔符时可能还没读完（如数字"-0."、"12"），等下一块数据再确认
+            if end is not None and (done or (end < len(buf) and buf[end] in WHITESPACE + ',]')):
+                pos, expect = end, 'sep'
+                yield item
+                continue
+            if done:
+                raise ValueError("truncated JSON array")
+        elif done:
+            raise ValueError("truncated JSON array")
+        chunk = next(chunks, None)
+        if chunk is None:
+            done = True
+            buf = buf[pos:] + text.decode(b'', final=True)
+        else:
+            buf = buf[pos:] + text.decode(chunk)
+        pos = 0
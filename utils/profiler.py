@@ -0,0 +1,99 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def peak_rss():
+    # Linux上ru_maxrss单位为KB，macOS上为字节，Windows上没有resource模块
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+class Profiler:
+
+    def __init__(self):
+        self.enabled = False
+        self.cprofile = set()
+        self.phases = []
+        self.requests = []
+        self.stats = {}
+        self.start = time.perf_counter()
+
+    def enable(self, cprofile=()):
+        self.enabled = True
+        self.cprofile = set(cprofile)
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        profile = None
+        if name in self.cprofile:
+            # cProfile/pstats只在需要时导入，不影响普通运行的启动时间
+            import cProfile
+            profile = cProfile.Profile()
+        start, rss = time.perf_counter(), peak_rss()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                import io
+                import pstats
+                out = io.StringIO()
+                pstats.Stats(profile, stream=out).sort_stats('cumulative').print_stats(25)
+                self.stats[name] = out.getvalue()
+            self.phases.append({
+                'phase': name,
+                'wall': time.perf_counter() - start,
+                'peak_rss': peak_rss(),
+                'rss_growth': peak_rss() - rss,
+            })
+
+    def request(self, url, status, latency, size):
+        if self.enabled:
+            self.requests.append({ 'url': url, 'status': status, 'latency': latency, 'size': size })
+
+    def summary(self):
+        return {
+            'total': time.perf_counter() - self.start,
+            'peak_rss': peak_rss(),
+            'phases': self.phases,
+            'requests': self.requests,
+        }
+
+    def report(self):
+        summary = self.summary()
+        lines = ["%-24s %10s %14s %14s" % ('phase', 'wall(s)', 'peak RSS(MB)', 'growth(MB)')]
+        for phase in summary['phases']:
+            lines.append("%-24s %10.3f %14.1f %14.1f" % (phase['phase'], phase['wall'], phase['peak_rss'] / 2 ** 20, phase['rss_growth'] / 2 ** 20))
+        lines.append("%-24s %10.3f %14.1f" % ('total', summary['total'], summary['peak_rss'] / 2 ** 20))
+        if self.requests:
+            lines.append("")
+            lines.append("%-6s %10s %12s  %s" % ('status', 'latency(s)', 'size(KB)', 'url'))
+            for req in self.requests:
+                lines.append("%-6s %10.3f %12.1f  %s" % (req['status'], req['latency'], req['size'] / 1024, req['url']))
+            lines.append("%d requests, %.1f KB, %.3f s total latency" % (
+                len(self.requests), sum(req['size'] for req in self.requests) / 1024, sum(req['latency'] for req in self.requests)))
+        for name, stats in self.stats.items():
+            lines.append("")
+            lines.append("cProfile: %s" % name)
+            lines.append(stats.rstrip())
+        return '\n'.join(lines)
+
+    def dump(self, filename):
+        with open(filename, 'w', encoding="utf-8") as f:
+            json.dump(dict(self.summary(), cprofile=self.stats), f, indent=2)
+
+# 全局实例，未enable时phase/request不做任何记录
+profiler = Profiler()
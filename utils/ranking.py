@@ -0,0 +1,85 @@
+from bisect import bisect_left, insort
+
+class Ranking:
+    '''
+    按分数排序的队伍集合，分桶有序列表实现::
+
+        ranking.update(team_id, (-num_solved, total_time, max_submission_id))
+        list(ranking)                # 按名次排列的队伍id
+        list(ranking.ranked())       # [(名次, 队伍id), ...]
+
+    分数没有变化的队伍update直接返回，有变化的队伍只在桶内二分移动，不需要重新排序整个榜单。
+    分数相同的队伍按第一次加入的顺序排列，与对原榜单做稳定排序的结果一致。
+    '''
+
+    def __init__(self, load=256):
+        self.load = load
+        # 每个桶是有序的(key, seq, team_id)列表，maxes为每个桶的最后一个元素
+        self.buckets = []
+        self.maxes = []
+        self.entries = {}
+        self.seq = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, team_id):
+        return team_id in self.entries
+
+    def __iter__(self):
+        for bucket in self.buckets:
+            for item in bucket:
+                yield item[2]
+
+    def update(self, team_id, key):
+        item = self.entries.get(team_id)
+        if item is not None:
+            if item[0] == key:
+                return False
+            self.delete(item)
+        item = (key, self.seq.setdefault(team_id, len(self.seq)), team_id)
+        self.entries[team_id] = item
+        self.insert(item)
+        return True
+
+    def remove(self, team_id):
+        self.delete(self.entries.pop(team_id))
+
+    def ranked(self):
+        '''
+        按顺序返回(名次, 队伍id)，分数相同名次相同，其后的名次顺延
+        '''
+        rank, last = 0, None
+        for idx, item in enumerate(self.items()):
+            if item[0] != last:
+                rank, last = idx + 1, item[0]
+            yield rank, item[2]
+
+    def items(self):
+        for bucket in self.buckets:
+            yield from bucket
+
+    def insert(self, item):
+        if not self.buckets:
+            self.buckets.append([item])
+            self.maxes.append(item)
+            return
+        idx = bisect_left(self.maxes, item)
+        if idx == len(self.maxes):
+            idx -= 1
+        bucket = self.buckets[idx]
+        insort(bucket, item)
+        self.maxes[idx] = bucket[-1]
+        if len(bucket) > 2 * self.load:
+            self.buckets[idx:idx + 1] = [bucket[:self.load], bucket[self.load:]]
+            self.maxes[idx:idx + 1] = [bucket[self.load - 1], bucket[-1]]
+
+    def delete(self, item):
+        idx = bisect_left(self.maxes, item)
+        bucket = self.buckets[idx]
+        del bucket[bisect_left(bucket, item)]
+        if bucket:
+            self.maxes[idx] = bucket[-1]
+        else:
+            del self.buckets[idx]
+            del self.maxes[idx]
@@ -0,0 +1,67 @@
+from utils.utils import ctime2timestamp
+
+# 只保留生成滚榜数据需要的字段，使用__slots__避免每条记录带一个dict
+# __reduce__直接按构造参数序列化，快照的保存和读取比默认的__slots__状态快一倍
+
+class Team:
+    __slots__ = ('id', 'icpc_id', 'name', 'organization_id', 'group_ids', 'affiliation', 'members')
+
+    def __init__(self, id, icpc_id, name, organization_id, group_ids, affiliation=None, members=None):
+        self.id = id
+        self.icpc_id = icpc_id
+        self.name = name
+        self.organization_id = organization_id
+        self.group_ids = tuple(group_ids)
+        self.affiliation = affiliation
+        self.members = members
+
+    def __reduce__(self):
+        return (Team, (self.id, self.icpc_id, self.name, self.organization_id, self.group_ids, self.affiliation, self.members))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['id'], data.get('icpc_id'), data['name'], data.get('organization_id'), data.get('group_ids') or [],
+                   data.get('affiliation'), data.get('public_description'))
+
+class Submission:
+    __slots__ = ('id', 'team_id', 'problem_id', 'contest_seconds', 'judgement_type')
+
+    def __init__(self, id, team_id, problem_id, contest_seconds, judgement_type=None):
+        self.id = id
+        self.team_id = team_id
+        self.problem_id = problem_id
+        self.contest_seconds = contest_seconds
+        # 指向共享的judgement type，不复制
+        self.judgement_type = judgement_type
+
+    def __reduce__(self):
+        return (Submission, (self.id, self.team_id, self.problem_id, self.contest_seconds, self.judgement_type))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['id'], data['team_id'], data['problem_id'], ctime2timestamp(data['contest_time']))
+
+class Judgement:
+    __slots__ = ('id', 'submission_id', 'judgement_type_id')
+
+    def __init__(self, id, submission_id, judgement_type_id):
+        self.id = id
+        self.submission_id = submission_id
+        self.judgement_type_id = judgement_type_id
+
+    def __reduce__(self):
+        return (Judgement, (self.id, self.submission_id, self.judgement_type_id))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['id'], data['submission_id'], data['judgement_type_id'])
+
+class TeamAttributes:
+    __slots__ = ('occupy', 'best_girl', 'group_name', 'affiliation')
+
+    def __init__(self, occupy, best_girl, group_name, affiliation):
+        # occupy: 是否占用获奖名额（打星队伍为False）
+        self.occupy = occupy
+        self.best_girl = best_girl
+        self.group_name = group_name
+        self.affiliation = affiliation
@@ -0,0 +1,97 @@
+from functools import lru_cache
+
+from utils.ranking import Ranking
+
+@lru_cache(maxsize=None)
+def numpy():
+    # numpy导入较慢，第一次计算分数时才导入，没有安装时返回None
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def team_scores(team_ids, submissions, penalty_seconds):
+    '''
+    按提交顺序计算每个队伍的(通过题数, 罚时秒数, 各题首次通过提交id的最大值)::
+
+        - 每题以第一次通过为准，之后的提交忽略
+        - 通过前每次计罚时的错误提交加penalty_seconds
+        - 通过时间按分钟截断
+        - 还没有评测结果（judgement_type为None）的提交忽略
+    '''
+    submissions = [submission for submission in submissions if submission.judgement_type is not None]
+    if numpy() is not None and len(submissions) > 0:
+        return team_scores_numpy(team_ids, submissions, penalty_seconds)
+    return team_scores_python(team_ids, submissions, penalty_seconds)
+
+def team_scores_python(team_ids, submissions, penalty_seconds):
+    scores = { team_id: [0, 0, 0] for team_id in team_ids }
+    solved, wrong = set(), {}
+    for submission in submissions:
+        score = scores.get(submission.team_id)
+        key = (submission.team_id, submission.problem_id)
+        if score is None or key in solved:
+            continue
+        if submission.judgement_type['solved']:
+            solved.add(key)
+            score[0] += 1
+            score[1] += int(submission.contest_seconds) // 60 * 60 + wrong.get(key, 0) * penalty_seconds
+            score[2] = max(score[2], int(submission.id))
+        elif submission.judgement_type['penalty']:
+            wrong[key] = wrong.get(key, 0) + 1
+    return { team_id: tuple(score) for team_id, score in scores.items() }
+
+def team_scores_numpy(team_ids, submissions, penalty_seconds):
+    np = numpy()
+    team_idx = { team_id: idx for idx, team_id in enumerate(team_ids) }
+    problem_idx = {}
+    n, teams = len(submissions), len(team_ids)
+    team = np.fromiter((team_idx.get(submission.team_id, -1) for submission in submissions), np.int64, n)
+    problem = np.fromiter((problem_idx.setdefault(submission.problem_id, len(problem_idx)) for submission in submissions), np.int64, n)
+    ac = np.fromiter((submission.judgement_type['solved'] for submission in submissions), bool, n)
+    penalty = np.fromiter((submission.judgement_type['penalty'] for submission in submissions), bool, n)
+    seconds = np.fromiter((int(submission.contest_seconds) for submission in submissions), np.int64, n)
+    ids = np.fromiter((int(submission.id) for submission in submissions), np.int64, n)
+
+    # 去掉不在队伍列表里的提交，pos保留原始提交顺序
+    pos = np.nonzero(team >= 0)[0]
+    problems = len(problem_idx)
+    key = team[pos] * problems + problem[pos]
+    # 每个(队伍, 题目)第一次通过的位置，未通过为n
+    first = np.full(teams * problems, n, np.int64)
+    np.minimum.at(first, key[ac[pos]], pos[ac[pos]])
+    has = first < n
+    # 第一次通过之前的计罚时提交数
+    before = penalty[pos] & ~ac[pos] & (pos < first[key])
+    wrong = np.bincount(key[before], minlength=teams * problems)
+
+    time, last = np.zeros(teams * problems, np.int64), np.zeros(teams * problems, np.int64)
+    time[has] = seconds[first[has]] // 60 * 60 + wrong[has] * penalty_seconds
+    last[has] = ids[first[has]]
+    num_solved = has.reshape(teams, problems).sum(axis=1)
+    total_time = time.reshape(teams, problems).sum(axis=1)
+    max_id = last.reshape(teams, problems).max(axis=1, initial=0)
+    return { team_id: (int(num_solved[idx]), int(total_time[idx]), int(max_id[idx])) for team_id, idx in team_idx.items() }
+
+def score_key(score):
+    return (-score['num_solved'], score['total_time'], score['max_submission_id'])
+
+def rank_rows(rows, ranking=None):
+    '''
+    按(-通过题数, 罚时, 最大通过提交id)排列rows并填写名次，分数完全相同的队伍名次相同，其后的名次顺延
+
+    传入上一次返回的Ranking时只移动分数有变化的队伍，不重新排序；rows和名次仍按整个榜单重新填写
+    '''
+    if ranking is None:
+        ranking = Ranking()
+    row_dict = {}
+    for row in rows:
+        row_dict[row['team_id']] = row
+        ranking.update(row['team_id'], score_key(row['score']))
+    for team_id in [team_id for team_id in ranking if team_id not in row_dict]:
+        ranking.remove(team_id)
+    rows[:] = [row_dict[team_id] for team_id in ranking]
+    for row, (rank, _) in zip(rows, ranking.ranked()):
+        row['rank'] = rank
+    return ranking
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+from utils.config_loader import check_output_format
+from utils.NDJSON import NDJSON_iter, resolver_events
+from utils.XML import XML_dump
+
+CONTENT_TYPES = {
+    '.xml': 'application/xml; charset=utf-8',
+    '.ndjson': 'application/x-ndjson; charset=utf-8',
+    '.csv': 'text/csv; charset=utf-8',
+}
+
+def feed_position(contest):
+    # 使用event_feed时以最后一个事件的位置标识上游状态，位置不变时不需要重新生成
+    feed = getattr(contest, 'feed', None)
+    return None if feed is None or feed.token is None else str(feed.token)
+
+def build(contest, name):
+    '''
+    在内存中生成与export相同的文件，返回{路径: (内容, ETag)}
+    '''
+    output_format = check_output_format(contest.config)
+    files = {}
+    if output_format in ('xml', 'both'):
+        files['/' + name + '.xml'] = XML_dump(contest.resolver_formatter(), contest.config.get('compact_xml', False))
+    if output_format in ('json', 'both'):
+        files['/' + name + '.ndjson'] = ''.join(NDJSON_iter(resolver_events(contest.resolver_contest_formatter(), contest.judgement_types)))
+    # 奖项列表在生成xml/ndjson时填写
+    files['/' + name + '.csv'] = '\n'.join(contest.award_list)
+    result = {}
+    for path, text in files.items():
+        content = text.encode('utf-8')
+        result[path] = (content, '"%s"' % hashlib.blake2b(content, digest_size=16).hexdigest())
+    return result
+
+class ExportCache:
+    '''
+    保存最近一次生成的导出文件，由刷新线程整体替换；请求只读取当前的字典，
+    并发的客户端拿到同一份内容，不会触发生成或访问domserver
+    '''
+
+    def __init__(self, contest, name):
+        self.contest = contest
+        self.name = name
+        self.position = None
+        self.files = {}
+
+    def update(self, position):
+        if self.files and position is not None and position == self.position:
+            return False
+        files = build(self.contest, self.name)
+        changed = files != self.files
+        self.files, self.position = files, position
+        return changed
+
+    def refresh(self, interval, stop):
+        while not stop.wait(interval):
+            start = time.perf_counter()
+            try:
+                self.contest.refresh()
+                changed = self.update(feed_position(self.contest))
+            except Exception:
+                traceback.print_exc()
+                print ("[%s] refresh failed, serving previous export" % time.strftime('%H:%M:%S'))
+                continue
+            print ("[%s] %s in %.3f s" % (time.strftime('%H:%M:%S'), 'updated' if changed else 'unchanged', time.perf_counter() - start))
+
+class ExportServer(ThreadingMixIn, HTTPServer):
+    # 与python 3.7+的ThreadingHTTPServer相同
+    daemon_threads = True
+
+class ExportHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.send_file(True)
+
+    def do_HEAD(self):
+        self.send_file(False)
+
+    def send_file(self, body):
+        entry = self.server.cache.files.get(self.path.split('?', 1)[0])
+        if entry is None:
+            self.send_error(404)
+            return
+        content, etag = entry
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPES[os.path.splitext(self.path.split('?', 1)[0])[1]])
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if body:
+            self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        print ("[%s] %s %s" % (time.strftime('%H:%M:%S'), self.address_string(), format % args))
+
+def serve(contest, filename, address, interval):
+    '''
+    在address（"[host:]port"）上提供导出文件::
+
+        GET /events.xml、/events.csv（文件名与配置中的xml相同）
+
+    每隔interval秒刷新一次比赛数据，上游状态（event-feed位置）变化时重新生成；
+    响应带ETag，客户端用If-None-Match轮询时内容没有变化返回304。
+    '''
+    host, _, port = address.rpartition(':')
+    cache = ExportCache(contest, os.path.basename(filename))
+    cache.update(feed_position(contest))
+    server = ExportServer((host or '127.0.0.1', int(port)), ExportHandler)
+    server.cache = cache
+    stop = threading.Event()
+    refresher = threading.Thread(target=cache.refresh, args=(interval, stop), daemon=True)
+    refresher.start()
+    print ("[   ] serving %s on http://%s:%d/" % (', '.join(sorted(cache.files)), *server.server_address[:2]))
+    try:
+        server.serve_forever()
+    finally:
+        stop.set()
+        server.server_close()
+    return cache
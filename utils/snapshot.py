@@ -0,0 +1,44 @@
+import gc
+import hashlib
+import os
+import pickle
+import struct
+
+# 文件格式：头部(魔数、版本、来源、sha256、长度) + pickle数据
+# 修改records中的类或快照字段后需要增加VERSION，旧快照会被拒绝而不是读出错误的数据
+MAGIC = b'RSLVSNAP'
+VERSION = 1
+HEADER = struct.Struct('<8sH16s32sQ')
+
+def save_snapshot(filename, source, state):
+    payload = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+    header = HEADER.pack(MAGIC, VERSION, source.encode(), hashlib.sha256(payload).digest(), len(payload))
+    with open(filename + '.tmp', 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(filename + '.tmp', filename)
+
+def load_snapshot(filename, source):
+    with open(filename, 'rb') as f:
+        header = f.read(HEADER.size)
+        payload = f.read()
+    if len(header) != HEADER.size:
+        raise ValueError(f"{filename} is not a snapshot")
+    magic, version, snapshot_source, digest, length = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{filename} is not a snapshot")
+    if version != VERSION:
+        raise ValueError(f"{filename} has snapshot version {version}, expected {VERSION}")
+    snapshot_source = snapshot_source.rstrip(b'\0').decode()
+    if snapshot_source != source:
+        raise ValueError(f"{filename} was saved from {snapshot_source}, not {source}")
+    if len(payload) != length or hashlib.sha256(payload).digest() != digest:
+        raise ValueError(f"{filename} is corrupted (checksum mismatch)")
+    # 反序列化大量小对象时关闭gc，避免反复触发分代回收
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(payload)
+    finally:
+        if enabled:
+            gc.enable()
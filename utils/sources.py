@@ -0,0 +1,16 @@
+import importlib
+
+# 数据源名称 -> (模块, 类名)，只有选中的数据源才会被导入
+SOURCES = {
+    'domjudge': ('classes.domjudge', 'DOMjudge'),
+    'pta': ('classes.pta', 'PTA_school'),
+}
+
+def register_source(name, module, class_name):
+    SOURCES[name] = (module, class_name)
+
+def source_class(name):
+    if name not in SOURCES:
+        raise ValueError(f"Unknown source {name}, expected one of {', '.join(SOURCES)}")
+    module, class_name = SOURCES[name]
+    return getattr(importlib.import_module(module), class_name)
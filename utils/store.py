@@ -0,0 +1,80 @@
+class Store(dict):
+    '''
+    按id保存一类实体的当前状态，更新和删除都在原位进行，占用的内存只与当前实体数量有关
+
+    record不为空时保存record.from_json(data)，否则保存原始dict
+    '''
+
+    def __init__(self, items=(), record=None):
+        super().__init__(items)
+        self.record = record
+
+    def upsert(self, data):
+        self[data['id']] = data if self.record is None else self.record.from_json(data)
+
+    def delete(self, id):
+        self.pop(id, None)
+
+    def replace(self, items):
+        self.clear()
+        for data in items:
+            self.upsert(data)
+
+class JudgementStore(Store):
+    '''
+    按submission_id保存每个提交当前有效的评测::
+
+        - valid为false（重测后被替换）的评测不保存，若它是当前评测则删除
+        - 还在评测中（judgement_type_id为空）的评测不覆盖已有结果
+        - 同一提交的新评测覆盖旧评测
+    '''
+
+    def __init__(self, items=(), record=None):
+        super().__init__(items, record)
+        # 评测id -> 提交id，只记录当前保存的评测，用于按评测id删除
+        self.submission_ids = { self.judgement_id(judgement): submission_id for submission_id, judgement in self.items() }
+
+    def judgement_id(self, judgement):
+        return judgement['id'] if isinstance(judgement, dict) else judgement.id
+
+    def upsert(self, data):
+        if not data.get('valid', True) or data.get('judgement_type_id') is None:
+            if not data.get('valid', True):
+                self.delete(data['id'])
+            return
+        current = self.get(data['submission_id'])
+        if current is not None:
+            self.submission_ids.pop(self.judgement_id(current), None)
+        self.submission_ids[data['id']] = data['submission_id']
+        self[data['submission_id']] = data if self.record is None else self.record.from_json(data)
+
+    def delete(self, id):
+        submission_id = self.submission_ids.pop(id, None)
+        if submission_id is not None:
+            self.pop(submission_id, None)
+
+    def replace(self, items):
+        self.submission_ids.clear()
+        super().replace(items)
+
+def apply_event(stores, event):
+    '''
+    把一个event-feed事件应用到对应类型的Store，兼容两种格式::
+
+        2020: {"type", "id", "op": "create"/"update"/"delete", "data": {...}}
+        2022: {"type", "id", "token", "data": {...} / [...] / null}
+
+    返回False表示没有该类型的Store
+    '''
+    store = stores.get(event['type'])
+    if store is None:
+        return False
+    data = event.get('data')
+    if isinstance(data, list):
+        # 2022格式中id为空表示整个集合被替换
+        store.replace(data)
+    elif data is None or event.get('op') == 'delete':
+        store.delete(event.get('id') if data is None else data['id'])
+    else:
+        store.upsert(data)
+    return True
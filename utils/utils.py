@@ -1,13 +1,31 @@
-from dateutil import parser
-from functools import reduce
+from datetime import datetime, timezone
+from functools import lru_cache
 import random
 import string
 
+@lru_cache(maxsize=1024)
 def dtime2timestamp(dtime):
-    return parser.parse(dtime).timestamp()
+    # 常见的ISO-8601格式直接解析，其余格式（以及没有fromisoformat的python 3.6）交给dateutil
+    try:
+        return datetime.fromisoformat(dtime.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        from dateutil import parser
+        return parser.parse(dtime).timestamp()
 
+@lru_cache(maxsize=1024)
 def ctime2timestamp(ctime):
-    return reduce(lambda x, y: 60.0 * float(x) + float(y), ctime.split(':'), 0.0)
+    seconds = 0.0
+    for part in ctime.split(':'):
+        seconds = 60.0 * seconds + float(part)
+    return seconds
+
+def timestamp2dtime(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='milliseconds')
+
+def timestamp2ctime(seconds):
+    # CLICS相对时间格式 h:mm:ss.uuu
+    minutes, seconds = divmod(round(seconds, 3), 60)
+    return '%d:%02d:%06.3f' % (minutes // 60, minutes % 60, seconds)
 
 def randomstr(len):
     return ''.join(random.sample(string.ascii_letters, len))
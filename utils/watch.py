@@ -0,0 +1,29 @@
+import time
+import traceback
+
+def watch(contest, filename, interval, rounds=None):
+    '''
+    常驻运行：每隔interval秒刷新一次比赛数据并重新评奖、导出
+
+    导出是原子替换，内容不变时不改动文件；刷新或导出失败（如网络中断）时保留上一次的结果，下一轮重试。
+    配合event_feed和cache_dir每轮只下载新的事件和变化的接口。
+    '''
+    count, loaded = 0, True
+    while rounds is None or count < rounds:
+        start = time.perf_counter()
+        try:
+            # 第一轮使用构造时已经拉取的数据，之后每一轮（包括失败后的重试）都重新拉取
+            if not loaded:
+                contest.refresh()
+            loaded = False
+            changed = contest.export(filename)
+        except Exception:
+            traceback.print_exc()
+            print ("[%s] update failed, keeping previous output" % time.strftime('%H:%M:%S'))
+            time.sleep(interval)
+            continue
+        count += 1
+        print ("[%s] %s in %.3f s" % (time.strftime('%H:%M:%S'), 'updated' if changed else 'unchanged', time.perf_counter() - start))
+        if rounds is None or count < rounds:
+            time.sleep(max(0.0, interval - (time.perf_counter() - start)))
+    return count